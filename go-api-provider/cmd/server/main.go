@@ -18,6 +18,7 @@ import (
 	"github.com/Mahmoud-T-Almetwally/Image-Audio-Web-Search/internal/database"
 	"github.com/Mahmoud-T-Almetwally/Image-Audio-Web-Search/internal/service"
 	"google.golang.org/grpc"
+	"google.golang.org/grpc/keepalive"
 )
 
 func main() {
@@ -70,7 +71,14 @@ func main() {
 		log.Fatalf("Failed to listen for gRPC: %v", err)
 	}
 
-	grpcServer := grpc.NewServer()
+	// Lets the scraper pipeline ping its long-lived items stream (every 30s) without
+	// being disconnected for too many pings under the default 5 minute minimum.
+	grpcServer := grpc.NewServer(
+		grpc.KeepaliveEnforcementPolicy(keepalive.EnforcementPolicy{
+			MinTime:             10 * time.Second,
+			PermitWithoutStream: true,
+		}),
+	)
 
 	grpcHandler := api.NewGRPCHandler(indexService)
 
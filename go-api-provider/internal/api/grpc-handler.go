@@ -3,6 +3,8 @@ package api
 
 import (
 	"context"
+	"errors"
+	"io"
 	"log"
 	"fmt"
 
@@ -54,3 +56,58 @@ func (h *GRPCHandler) ProcessScrapedItems(ctx context.Context, req *ipb.ProcessS
 	log.Printf("[Job %s] Sending ProcessScrapedItems response. Processed: %d, Failed: %d", jobID, processed, failed)
 	return resp, nil
 }
+
+
+// streamBatchSize is how many streamed items are handed to the index service at once.
+const streamBatchSize = 100
+
+func (h *GRPCHandler) ProcessScrapedItemsStream(stream ipb.IndexingService_ProcessScrapedItemsStreamServer) error {
+	ctx := stream.Context()
+	var jobID string
+	batch := make([]*ipb.ScrapedItem, 0, streamBatchSize)
+	receivedCount, processedCount, failedCount := 0, 0, 0
+
+	// Indexes the items received so far while the client keeps streaming.
+	flush := func() {
+		if len(batch) == 0 {
+			return
+		}
+		processed, failed, err := h.indexSvc.HandleScrapedBatch(ctx, batch, jobID)
+		if err != nil {
+			log.Printf("[Job %s] Error handling streamed batch of %d items: %v", jobID, len(batch), err)
+			failed = len(batch) - processed
+		}
+		processedCount += processed
+		failedCount += failed
+		batch = make([]*ipb.ScrapedItem, 0, streamBatchSize)
+	}
+
+	for {
+		req, err := stream.Recv()
+		if errors.Is(err, io.EOF) {
+			break
+		}
+		if err != nil {
+			log.Printf("[Job %s] Error receiving ProcessScrapedItemsStream: %v", jobID, err)
+			return err
+		}
+		if jobID == "" {
+			jobID = req.GetJobId()
+		}
+		items := req.GetItems()
+		receivedCount += len(items)
+		batch = append(batch, items...)
+		if len(batch) >= streamBatchSize {
+			flush()
+		}
+	}
+	flush()
+
+	log.Printf("[Job %s] ProcessScrapedItemsStream closed. Received: %d, Processed: %d, Failed: %d", jobID, receivedCount, processedCount, failedCount)
+	return stream.SendAndClose(&ipb.ProcessScrapedItemsResponse{
+		ItemsReceived:  int32(receivedCount),
+		ItemsProcessed: int32(processedCount),
+		ItemsFailed:    int32(failedCount),
+		Message:        fmt.Sprintf("Stream processed for job %s. Results - Processed: %d, Failed: %d", jobID, processedCount, failedCount),
+	})
+}
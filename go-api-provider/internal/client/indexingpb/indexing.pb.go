@@ -271,9 +271,10 @@ const file_indexing_proto_rawDesc = "" +
 	"\tMediaType\x12\v\n" +
 	"\aUNKNOWN\x10\x00\x12\t\n" +
 	"\x05IMAGE\x10\x01\x12\t\n" +
-	"\x05AUDIO\x10\x022u\n" +
+	"\x05AUDIO\x10\x022\xe1\x01\n" +
 	"\x0fIndexingService\x12b\n" +
-	"\x13ProcessScrapedItems\x12$.indexing.ProcessScrapedItemsRequest\x1a%.indexing.ProcessScrapedItemsResponseB-Z+YOUR_MODULE_PATH/internal/client/indexingpbb\x06proto3"
+	"\x13ProcessScrapedItems\x12$.indexing.ProcessScrapedItemsRequest\x1a%.indexing.ProcessScrapedItemsResponse\x12j\n" +
+	"\x19ProcessScrapedItemsStream\x12$.indexing.ProcessScrapedItemsRequest\x1a%.indexing.ProcessScrapedItemsResponse(\x01B-Z+YOUR_MODULE_PATH/internal/client/indexingpbb\x06proto3"
 
 var (
 	file_indexing_proto_rawDescOnce sync.Once
@@ -299,9 +300,11 @@ var file_indexing_proto_depIdxs = []int32{
 	0, // 0: indexing.ScrapedItem.media_type:type_name -> indexing.MediaType
 	1, // 1: indexing.ProcessScrapedItemsRequest.items:type_name -> indexing.ScrapedItem
 	2, // 2: indexing.IndexingService.ProcessScrapedItems:input_type -> indexing.ProcessScrapedItemsRequest
-	3, // 3: indexing.IndexingService.ProcessScrapedItems:output_type -> indexing.ProcessScrapedItemsResponse
-	3, // [3:4] is the sub-list for method output_type
-	2, // [2:3] is the sub-list for method input_type
+	2, // 3: indexing.IndexingService.ProcessScrapedItemsStream:input_type -> indexing.ProcessScrapedItemsRequest
+	3, // 4: indexing.IndexingService.ProcessScrapedItems:output_type -> indexing.ProcessScrapedItemsResponse
+	3, // 5: indexing.IndexingService.ProcessScrapedItemsStream:output_type -> indexing.ProcessScrapedItemsResponse
+	4, // [4:6] is the sub-list for method output_type
+	2, // [2:4] is the sub-list for method input_type
 	2, // [2:2] is the sub-list for extension type_name
 	2, // [2:2] is the sub-list for extension extendee
 	0, // [0:2] is the sub-list for field type_name
@@ -19,7 +19,8 @@ import (
 const _ = grpc.SupportPackageIsVersion9
 
 const (
-	IndexingService_ProcessScrapedItems_FullMethodName = "/indexing.IndexingService/ProcessScrapedItems"
+	IndexingService_ProcessScrapedItems_FullMethodName       = "/indexing.IndexingService/ProcessScrapedItems"
+	IndexingService_ProcessScrapedItemsStream_FullMethodName = "/indexing.IndexingService/ProcessScrapedItemsStream"
 )
 
 // IndexingServiceClient is the client API for IndexingService service.
@@ -27,6 +28,10 @@ const (
 // For semantics around ctx use and closing/ending streaming RPCs, please refer to https://pkg.go.dev/google.golang.org/grpc/?tab=doc#ClientConn.NewStream.
 type IndexingServiceClient interface {
 	ProcessScrapedItems(ctx context.Context, in *ProcessScrapedItemsRequest, opts ...grpc.CallOption) (*ProcessScrapedItemsResponse, error)
+	// Same as ProcessScrapedItems for a whole crawl: the client streams its items
+	// as they are scraped (any number per message, job_id set on the first one)
+	// and gets the totals once it closes the stream.
+	ProcessScrapedItemsStream(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse], error)
 }
 
 type indexingServiceClient struct {
@@ -47,11 +52,28 @@ func (c *indexingServiceClient) ProcessScrapedItems(ctx context.Context, in *Pro
 	return out, nil
 }
 
+func (c *indexingServiceClient) ProcessScrapedItemsStream(ctx context.Context, opts ...grpc.CallOption) (grpc.ClientStreamingClient[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse], error) {
+	cOpts := append([]grpc.CallOption{grpc.StaticMethod()}, opts...)
+	stream, err := c.cc.NewStream(ctx, &IndexingService_ServiceDesc.Streams[0], IndexingService_ProcessScrapedItemsStream_FullMethodName, cOpts...)
+	if err != nil {
+		return nil, err
+	}
+	x := &grpc.GenericClientStream[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse]{ClientStream: stream}
+	return x, nil
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type IndexingService_ProcessScrapedItemsStreamClient = grpc.ClientStreamingClient[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse]
+
 // IndexingServiceServer is the server API for IndexingService service.
 // All implementations must embed UnimplementedIndexingServiceServer
 // for forward compatibility.
 type IndexingServiceServer interface {
 	ProcessScrapedItems(context.Context, *ProcessScrapedItemsRequest) (*ProcessScrapedItemsResponse, error)
+	// Same as ProcessScrapedItems for a whole crawl: the client streams its items
+	// as they are scraped (any number per message, job_id set on the first one)
+	// and gets the totals once it closes the stream.
+	ProcessScrapedItemsStream(grpc.ClientStreamingServer[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse]) error
 	mustEmbedUnimplementedIndexingServiceServer()
 }
 
@@ -65,6 +87,9 @@ type UnimplementedIndexingServiceServer struct{}
 func (UnimplementedIndexingServiceServer) ProcessScrapedItems(context.Context, *ProcessScrapedItemsRequest) (*ProcessScrapedItemsResponse, error) {
 	return nil, status.Errorf(codes.Unimplemented, "method ProcessScrapedItems not implemented")
 }
+func (UnimplementedIndexingServiceServer) ProcessScrapedItemsStream(grpc.ClientStreamingServer[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse]) error {
+	return status.Errorf(codes.Unimplemented, "method ProcessScrapedItemsStream not implemented")
+}
 func (UnimplementedIndexingServiceServer) mustEmbedUnimplementedIndexingServiceServer() {}
 func (UnimplementedIndexingServiceServer) testEmbeddedByValue()                         {}
 
@@ -104,6 +129,13 @@ func _IndexingService_ProcessScrapedItems_Handler(srv interface{}, ctx context.C
 	return interceptor(ctx, in, info, handler)
 }
 
+func _IndexingService_ProcessScrapedItemsStream_Handler(srv interface{}, stream grpc.ServerStream) error {
+	return srv.(IndexingServiceServer).ProcessScrapedItemsStream(&grpc.GenericServerStream[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse]{ServerStream: stream})
+}
+
+// This type alias is provided for backwards compatibility with existing code that references the prior non-generic stream type by name.
+type IndexingService_ProcessScrapedItemsStreamServer = grpc.ClientStreamingServer[ProcessScrapedItemsRequest, ProcessScrapedItemsResponse]
+
 // IndexingService_ServiceDesc is the grpc.ServiceDesc for IndexingService service.
 // It's only intended for direct use with grpc.RegisterService,
 // and not to be introspected or modified (even as a copy)
@@ -116,6 +148,12 @@ var IndexingService_ServiceDesc = grpc.ServiceDesc{
 			Handler:    _IndexingService_ProcessScrapedItems_Handler,
 		},
 	},
-	Streams:  []grpc.StreamDesc{},
+	Streams: []grpc.StreamDesc{
+		{
+			StreamName:    "ProcessScrapedItemsStream",
+			Handler:       _IndexingService_ProcessScrapedItemsStream_Handler,
+			ClientStreams: true,
+		},
+	},
 	Metadata: "indexing.proto",
 }
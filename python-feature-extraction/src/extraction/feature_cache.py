@@ -0,0 +1,127 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(slots=True)
+class CacheLookup:
+    """Cache keys, cached vectors and misses (hits replaced by None) of a batch."""
+
+    keys: List[Optional[bytes]]
+    cached: List[Optional[np.ndarray]]
+    misses: List[Optional[bytes]]
+
+
+class FeatureCache:
+    """
+    Thread-safe LRU of feature vectors keyed by a hash of the encoded media bytes and
+    the preprocessing options, so re-queried assets skip decoding and the forward.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        Args:
+            max_size: Maximum number of cached vectors. The least recently used
+                      vector is evicted first.
+        """
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(media_bytes: bytes, apply_denoise: bool) -> bytes:
+        """Returns the cache key of an encoded media file and its denoise option."""
+        digest = hashlib.blake2b(media_bytes, digest_size=16).digest()
+        return digest + (b"\x01" if apply_denoise else b"\x00")
+
+    def get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def put(self, key: bytes, vector: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def extract(
+        self,
+        extract_fn: Callable[
+            [List[Optional[bytes]], Optional[np.ndarray]], Tuple[np.ndarray, np.ndarray]
+        ],
+        media_bytes_list: List[Optional[bytes]],
+        apply_denoise: bool,
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Runs a wrapper's batch extraction only for the inputs that are not cached and
+        splices the cached vectors into its result.
+
+        Args:
+            extract_fn: Called as extract_fn(media_bytes_list, out) with cache hits
+                        replaced by None; returns (features, ok_mask).
+            media_bytes_list: The encoded media files. None entries are skipped.
+            apply_denoise: The denoise option, part of the cache key.
+            out: Optional output matrix, passed through to extract_fn.
+
+        Returns:
+            The (features, ok_mask) of the whole batch, as extract_fn would return.
+        """
+        lookup = self.lookup(media_bytes_list, apply_denoise)
+
+        if any(lookup.misses):
+            features, ok_mask = extract_fn(lookup.misses, out)
+        else:
+            ok_mask = np.zeros(len(lookup.keys), dtype=bool)
+            features = (
+                out
+                if out is not None
+                else np.empty((len(lookup.keys), 0), dtype=np.float32)
+            )
+        return self.merge(lookup, features, ok_mask)
+
+    def lookup(
+        self, media_bytes_list: List[Optional[bytes]], apply_denoise: bool
+    ) -> CacheLookup:
+        """Looks up a batch of encoded media files in the cache."""
+        keys = [
+            self.key(media_bytes, apply_denoise) if media_bytes else None
+            for media_bytes in media_bytes_list
+        ]
+        cached = [self.get(key) if key is not None else None for key in keys]
+        misses = [
+            None if vector is not None else media_bytes
+            for media_bytes, vector in zip(media_bytes_list, cached)
+        ]
+        return CacheLookup(keys, cached, misses)
+
+    def merge(
+        self, lookup: CacheLookup, features: np.ndarray, ok_mask: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Splices the cached vectors of a lookup into the (features, ok_mask) computed
+        for its misses, and caches the newly computed vectors.
+        """
+        keys, cached = lookup.keys, lookup.cached
+        hit_rows = [i for i, vector in enumerate(cached) if vector is not None]
+        if hit_rows:
+            feature_dim = cached[hit_rows[0]].shape[0]
+            if features.shape[1] != feature_dim:
+                # No input was run through the model (all hits or all failed).
+                features = np.zeros((len(keys), feature_dim), dtype=np.float32)
+            features[hit_rows] = np.stack([cached[i] for i in hit_rows])
+            ok_mask[hit_rows] = True
+
+        for i in np.flatnonzero(ok_mask):
+            if cached[i] is None and keys[i] is not None:
+                self.put(keys[i], features[i].copy())
+
+        return features, ok_mask
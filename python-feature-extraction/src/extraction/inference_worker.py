@@ -0,0 +1,298 @@
+import itertools
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .extractor import ExtractionResult, get_extractor
+
+logger = logging.getLogger(__name__)
+
+
+# Jobs the inference process runs at once, across all its connections: the
+# downloads and decoding of concurrent jobs overlap, the models run one at a time.
+WORKER_THREADS = 8
+
+_OP_URL_COLUMNS = "process_url_columns"
+_OP_BATCH_BYTES = "process_batch_bytes"
+
+# (url, status, error_message, vector shape or None) of each result, and the name
+# of the shared memory block holding their float32 vectors back to back.
+_ResultMeta = Tuple[str, int, Optional[str], Optional[Tuple[int, ...]]]
+_PackedResults = Tuple[List[_ResultMeta], Optional[str]]
+
+
+def _pack_results(results: List[ExtractionResult]) -> _PackedResults:
+    """
+    Copies the feature vectors of results into one new shared memory block, so
+    only the small per-result metadata is pickled through the pipe. The block is
+    handed over to the receiving process, which unlinks it.
+    """
+    vectors = [
+        (
+            np.ascontiguousarray(res.feature_vector, dtype=np.float32)
+            if res.feature_vector is not None
+            else None
+        )
+        for res in results
+    ]
+    metas = [
+        (res.url, res.status, res.error_message, None if v is None else v.shape)
+        for res, v in zip(results, vectors)
+    ]
+    total_bytes = sum(v.nbytes for v in vectors if v is not None)
+    if not total_bytes:
+        return metas, None
+
+    shm = shared_memory.SharedMemory(create=True, size=total_bytes)
+    try:
+        block = np.ndarray((total_bytes // 4,), dtype=np.float32, buffer=shm.buf)
+        offset = 0
+        for v in vectors:
+            if v is not None:
+                block[offset : offset + v.size] = v.ravel()
+                offset += v.size
+        del block
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    shm.close()
+    # The receiver attaches (registering the block again) and unlinks it.
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return metas, shm.name
+
+
+def _discard_packed(packed: _PackedResults) -> None:
+    """Frees the shared memory block of results that will not be unpacked."""
+    _, shm_name = packed
+    if shm_name is None:
+        return
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _unpack_results(packed: _PackedResults) -> List[ExtractionResult]:
+    """Rebuilds the results of _pack_results and frees their shared memory block."""
+    metas, shm_name = packed
+    if shm_name is None:
+        return [
+            ExtractionResult(url, status, None, error_message)
+            for url, status, error_message, _ in metas
+        ]
+
+    num_floats = sum(int(np.prod(shape)) for *_, shape in metas if shape is not None)
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # One copy out of the block; the vectors are then views into it, like the
+        # stacked model outputs they came from.
+        block = np.ndarray((num_floats,), dtype=np.float32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    results: List[ExtractionResult] = []
+    offset = 0
+    for url, status, error_message, shape in metas:
+        vector = None
+        if shape is not None:
+            size = int(np.prod(shape))
+            vector = block[offset : offset + size].reshape(shape)
+            offset += size
+        results.append(ExtractionResult(url, status, vector, error_message))
+    return results
+
+
+def _run_job(
+    conn: Connection,
+    send_lock: threading.Lock,
+    extractor: Any,
+    job_id: int,
+    op: str,
+    args: tuple,
+) -> None:
+    try:
+        if op == _OP_URL_COLUMNS:
+            results = extractor.process_url_columns(*args)
+        elif op == _OP_BATCH_BYTES:
+            results = extractor.process_batch_bytes(*args)
+        else:
+            raise ValueError(f"Unknown inference operation: {op}")
+        reply = (job_id, _pack_results(results), None)
+    except Exception as e:
+        logger.error("Inference job %s (%s) failed: %s", job_id, op, e, exc_info=True)
+        # Sent as text: not every exception can be pickled.
+        reply = (job_id, None, f"{type(e).__name__}: {e}")
+    try:
+        with send_lock:
+            conn.send(reply)
+    except Exception as e:
+        logger.warning("Could not send the result of inference job %s: %s", job_id, e)
+        # Nobody will attach to the block, so it is freed here.
+        if reply[1] is not None:
+            _discard_packed(reply[1])
+
+
+def _serve_connection(
+    conn: Connection, extractor: Any, pool: ThreadPoolExecutor
+) -> None:
+    """Reads the jobs of one server process until it closes its end."""
+    send_lock = threading.Lock()
+    while True:
+        try:
+            job_id, op, args = conn.recv()
+        except (EOFError, OSError):
+            break
+        pool.submit(_run_job, conn, send_lock, extractor, job_id, op, args)
+    conn.close()
+
+
+def run_inference_worker(
+    conns: Sequence[Connection], extractor_kwargs: Dict[str, Any]
+) -> None:
+    """
+    Entry point of the inference process: loads the Extractor once and runs the
+    jobs of every server process connected through `conns`, until all of them
+    have closed their end.
+
+    Args:
+        conns: One pipe end per server process (see RemoteExtractor).
+        extractor_kwargs: Passed to get_extractor.
+    """
+    try:
+        extractor = get_extractor(**extractor_kwargs)
+    except Exception as e:
+        logger.critical("Failed to initialize Extractor: %s.", e, exc_info=True)
+        # Closing the pipes fails the pending and future calls of every client.
+        for conn in conns:
+            conn.close()
+        return
+
+    with ThreadPoolExecutor(
+        max_workers=WORKER_THREADS, thread_name_prefix="inference-job"
+    ) as pool:
+        readers = [
+            threading.Thread(
+                target=_serve_connection,
+                args=(conn, extractor, pool),
+                name=f"inference-conn-{i}",
+                daemon=True,
+            )
+            for i, conn in enumerate(conns)
+        ]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+
+
+class RemoteExtractor:
+    """
+    Stands in for the Extractor in a server process whose models live in the
+    inference process (run_inference_worker). process_url_columns and
+    process_batch_bytes are forwarded over a pipe; the feature vectors come back
+    through shared memory instead of being pickled.
+
+    Thread-safe: concurrent calls are multiplexed over the one pipe and run
+    concurrently in the inference process. Once the pipe closes (the inference
+    process exited), every call fails and on_closed is called, from the reader
+    thread, so the server can shut down and be restarted.
+    """
+
+    def __init__(
+        self, conn: Connection, on_closed: Optional[Callable[[], None]] = None
+    ):
+        self._conn = conn
+        self._on_closed = on_closed
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, "Future[List[ExtractionResult]]"] = {}
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._job_ids = itertools.count()
+        self._reader = threading.Thread(
+            target=self._read_replies, name="inference-replies", daemon=True
+        )
+        self._reader.start()
+
+    def process_url_columns(
+        self,
+        page_urls: Sequence[str],
+        media_urls: Sequence[Optional[str]],
+        media_types: Sequence[int],
+        apply_denoising: bool = True,
+        download_limits: Optional[Dict[int, Optional[int]]] = None,
+        resolved_types: Collection[int] = (),
+    ) -> List[ExtractionResult]:
+        """See Extractor.process_url_columns."""
+        return self._call(
+            _OP_URL_COLUMNS,
+            (
+                list(page_urls),
+                list(media_urls),
+                list(media_types),
+                apply_denoising,
+                download_limits,
+                frozenset(resolved_types),
+            ),
+        )
+
+    def process_batch_bytes(
+        self, items: List[Dict[str, Any]], apply_denoising: bool = True
+    ) -> List[ExtractionResult]:
+        """See Extractor.process_batch_bytes."""
+        return self._call(_OP_BATCH_BYTES, (items, apply_denoising))
+
+    def _call(self, op: str, args: tuple) -> List[ExtractionResult]:
+        future: "Future[List[ExtractionResult]]" = Future()
+        job_id = next(self._job_ids)
+        with self._pending_lock:
+            if self._closed:
+                raise RuntimeError("Inference process is not running.")
+            self._pending[job_id] = future
+        try:
+            with self._send_lock:
+                self._conn.send((job_id, op, args))
+        except Exception:
+            with self._pending_lock:
+                self._pending.pop(job_id, None)
+            raise
+        return future.result()
+
+    def _read_replies(self) -> None:
+        while True:
+            try:
+                job_id, packed, error = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._pending_lock:
+                future = self._pending.pop(job_id, None)
+            if future is None:
+                # The call is gone; its block would otherwise never be unlinked.
+                if packed is not None:
+                    _discard_packed(packed)
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(error))
+                continue
+            try:
+                future.set_result(_unpack_results(packed))
+            except Exception as e:
+                future.set_exception(e)
+
+        logger.error("Connection to the inference process closed.")
+        with self._pending_lock:
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            future.set_exception(RuntimeError("Inference process exited."))
+        if self._on_closed is not None:
+            self._on_closed()
@@ -1,34 +1,313 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import torch
-from transformers import AutoModel
+from torch.nn.utils.rnn import pad_sequence
+from transformers import AutoConfig, AutoModel
 from transformers import ClapModel, ClapProcessor
 from PIL import Image
 from timm.data.transforms_factory import create_transform
-import requests
+from torchvision.io import ImageReadMode, decode_jpeg
+from torchvision.transforms import Compose, ConvertImageDtype, Normalize
 from io import BytesIO
 import soundfile as sf
+import soxr
 import librosa
-from typing import List, Dict, Optional, Tuple
+from typing import Any, Callable, List, Dict, Optional, Tuple, Union
 import numpy as np
-from processing.audio import denoise_audio_spectral_gate
-from processing.image import denoise_image_bilateral, denoise_image_nlm
+from processing.audio import (
+    denoise_audio_spectral_gate,
+    denoise_audio_spectral_gate_torch,
+)
+from processing.image import (
+    decode_image_bilateral,
+    denoise_image_bilateral,
+    denoise_image_nlm,
+)
+from utils.network import download_media_batch
+from .feature_cache import FeatureCache
+from .quantization import quantize_linear_layers
+from .tensorrt_engine import build_engine, load_engine
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Both backbones take fixed-size inputs, so let fp32 matmuls/convolutions use TF32
+# tensor cores and let cuDNN benchmark once per shape and reuse the fastest kernels.
+torch.set_float32_matmul_precision("high")
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.backends.cudnn.allow_tf32 = True
+torch.backends.cudnn.benchmark = True
+
+
+# Batch sizes the compiled models are specialized for. Batches are zero-padded up to
+# the next bucket (and split into chunks of the largest one) so that a model compiled
+# with static shapes only ever sees these sizes instead of recompiling per batch size.
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+# Graphs Dynamo may keep per compiled function before it stops recompiling and falls
+# back to eager mode. The default (8) leaves little headroom over the bucket count.
+COMPILE_CACHE_LIMIT = 16
+
+# Preprocessed chunks the URL pipeline may queue ahead of the model.
+PIPELINE_DEPTH = 4
+
+# A captured forward: (graph, static input, static output).
+_CudaGraphEntry = Tuple["torch.cuda.CUDAGraph", torch.Tensor, torch.Tensor]
+
+
+def _autocast_dtype(device: torch.device) -> torch.dtype:
+    """bf16 where the GPU supports it (no fp16 overflow risk), fp16 otherwise."""
+    if device.type == "cuda" and torch.cuda.is_bf16_supported():
+        return torch.bfloat16
+    return torch.float16
+
+
+def _ensure_compile_cache_limit(limit: int = COMPILE_CACHE_LIMIT) -> None:
+    """Raises Dynamo's per-function recompile limit to at least `limit`."""
+    config = torch._dynamo.config
+    name = (
+        "recompile_limit" if hasattr(config, "recompile_limit") else "cache_size_limit"
+    )
+    setattr(config, name, max(getattr(config, name), limit))
+
+
+def _bucket_size(n: int) -> int:
+    """Returns the smallest batch bucket that fits n (n <= BATCH_BUCKETS[-1])."""
+    return next(bucket for bucket in BATCH_BUCKETS if bucket >= n)
+
+
+def _run_in_buckets(
+    fn: Callable[..., torch.Tensor], inputs: Dict[str, torch.Tensor]
+) -> torch.Tensor:
+    """
+    Calls fn(**chunk) on bucket-sized, zero-padded chunks of the batched inputs and
+    returns the concatenated outputs for the real rows only.
+
+    Outputs are cloned because CUDA-graph replays of the same bucket reuse (and
+    overwrite) their output buffers.
+    """
+    num_rows = next(iter(inputs.values())).shape[0]
+    max_bucket = BATCH_BUCKETS[-1]
+    outputs = []
+    for start in range(0, num_rows, max_bucket):
+        chunk = {
+            name: tensor[start : start + max_bucket] for name, tensor in inputs.items()
+        }
+        chunk_rows = min(max_bucket, num_rows - start)
+        padding = _bucket_size(chunk_rows) - chunk_rows
+        if padding:
+            chunk = {
+                name: torch.cat(
+                    [tensor, tensor.new_zeros((padding, *tensor.shape[1:]))]
+                )
+                for name, tensor in chunk.items()
+            }
+        outputs.append(fn(**chunk)[:chunk_rows].clone())
+    return outputs[0] if len(outputs) == 1 else torch.cat(outputs)
+
+
+def _copy_to_device(
+    tensors: Dict[str, torch.Tensor],
+    device: torch.device,
+    copy_stream: Optional["torch.cuda.Stream"],
+) -> Dict[str, torch.Tensor]:
+    """
+    Moves host tensors to the device. With a copy stream the (non_blocking, pinned)
+    copies are issued there, so they can overlap work already queued on the compute
+    stream; the current stream then waits only for these copies.
+    """
+    if copy_stream is None:
+        return {
+            name: tensor.to(device, non_blocking=True)
+            for name, tensor in tensors.items()
+        }
+
+    compute_stream = torch.cuda.current_stream(device)
+    with torch.cuda.stream(copy_stream):
+        on_device = {
+            name: tensor.to(device, non_blocking=True)
+            for name, tensor in tensors.items()
+        }
+    compute_stream.wait_stream(copy_stream)
+    for tensor in on_device.values():
+        # The copies were allocated on the copy stream but are consumed on the compute
+        # stream; keep the allocator from reusing them too early.
+        tensor.record_stream(compute_stream)
+    return on_device
+
+
+def _no_features(
+    num_inputs: int,
+    out: Optional[np.ndarray] = None,
+    device: Optional[torch.device] = None,
+) -> Tuple[Union[np.ndarray, torch.Tensor], np.ndarray]:
+    """
+    Returns the result of a batch in which no input produced features, with an
+    empty feature tensor on `device` if given instead of a host matrix.
+    """
+    ok_mask = np.zeros(num_inputs, dtype=bool)
+    if device is not None:
+        return torch.empty((num_inputs, 0), device=device), ok_mask
+    if out is None:
+        out = np.empty((num_inputs, 0), dtype=np.float32)
+    return out, ok_mask
+
+
+def _scatter_rows(
+    features: torch.Tensor, num_rows: int, rows: List[int]
+) -> torch.Tensor:
+    """
+    Places row j of a (M, feature_dim) feature matrix at index rows[j] of a
+    (num_rows, feature_dim) float32 matrix on the same device. Rows not listed are
+    zero.
+    """
+    features = features.detach().float()
+    if len(rows) != num_rows:
+        scattered = features.new_zeros((num_rows, features.shape[1]))
+        scattered[torch.as_tensor(rows, device=features.device)] = features
+        features = scattered
+    return features
+
+
+def _features_to_host(
+    features: torch.Tensor,
+    num_rows: int,
+    rows: List[int],
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Copies a (M, feature_dim) device feature matrix to the host, placing row j at
+    index rows[j] of a (num_rows, feature_dim) float32 matrix. Rows not listed are
+    zero. The scatter happens on the device so there is a single D2H copy, straight
+    into `out` when it is given (DMA without staging if `out` is pinned memory).
+    """
+    features = _scatter_rows(features, num_rows, rows)
+    if out is None:
+        return features.cpu().numpy()
+    torch.from_numpy(out).copy_(features)
+    return out
+
+
+def _pipelined_features_from_urls(
+    model: Any, urls: List[str], apply_denoise: bool
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extracts features for a long URL list in chunks of the largest batch bucket as a
+    producer-consumer pipeline: a producer thread downloads, looks up and decodes
+    the next chunks (up to PIPELINE_DEPTH ahead) while the calling thread runs the
+    model on the current one, so preprocessing and inference overlap.
+
+    Args:
+        model: A MambaVisionModel or CLAPModel.
+        urls: The media URLs.
+        apply_denoise: Whether to denoise the inputs.
+
+    Returns:
+        The (len(urls), feature_dim) float32 feature matrix and ok mask, as
+        get_features_batch returns them.
+    """
+    num_inputs = len(urls)
+    chunk_size = BATCH_BUCKETS[-1]
+    chunks = [
+        (start, urls[start : start + chunk_size])
+        for start in range(0, num_inputs, chunk_size)
+    ]
+    feature_cache = model._feature_cache
+    ready: "queue.Queue" = queue.Queue(maxsize=PIPELINE_DEPTH)
+    stop = threading.Event()
+    done = object()
+
+    def produce() -> None:
+        try:
+            for start, chunk_urls in chunks:
+                if stop.is_set():
+                    break
+                media_bytes_list = download_media_batch(
+                    chunk_urls,
+                    timeout=model.DOWNLOAD_TIMEOUT,
+                    max_workers=model.DOWNLOAD_WORKERS,
+                )
+                lookup = (
+                    feature_cache.lookup(media_bytes_list, apply_denoise)
+                    if feature_cache is not None
+                    else None
+                )
+                to_decode = lookup.misses if lookup is not None else media_bytes_list
+                try:
+                    batch = model.decode_batch(to_decode, apply_denoise)
+                except Exception as e:
+                    logger.error("Error building batch: %s", e)
+                    batch = (None, [])
+                ready.put((start, len(chunk_urls), lookup, batch))
+        finally:
+            ready.put(done)
+
+    producer = threading.Thread(
+        target=produce, name="feature-pipeline-producer", daemon=True
+    )
+    producer.start()
+
+    features: Optional[np.ndarray] = None
+    ok_mask = np.zeros(num_inputs, dtype=bool)
+    item = None
+    try:
+        while (item := ready.get()) is not done:
+            start, num_rows, lookup, (batch, indices) = item
+            chunk_features, chunk_mask = _no_features(num_rows)
+            if batch is not None:
+                try:
+                    chunk_features = model.get_features_from_batch(
+                        batch, indices, num_rows
+                    )
+                    chunk_mask[indices] = True
+                except Exception as e:
+                    logger.error(
+                        "Error during model inference or feature processing: %s", e
+                    )
+            if lookup is not None:
+                chunk_features, chunk_mask = feature_cache.merge(
+                    lookup, chunk_features, chunk_mask
+                )
+            if not chunk_mask.any():
+                continue
+            if features is None:
+                features = np.zeros(
+                    (num_inputs, chunk_features.shape[1]), dtype=np.float32
+                )
+            features[start : start + num_rows] = chunk_features
+            ok_mask[start : start + num_rows] = chunk_mask
+    finally:
+        # Unblock the producer if the consumer stopped early.
+        stop.set()
+        while item is not done:
+            item = ready.get()
+        producer.join()
+
+    if features is None:
+        return _no_features(num_inputs)
+    return features, ok_mask
+
 
 class MambaVisionModel:
 
     DEFAULT_INPUT_RES = (3, 256, 256)
-    REQUESTS_HEADERS = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
+    DOWNLOAD_TIMEOUT = 10
+    DOWNLOAD_WORKERS = 16
+    # PIL/NumPy release the GIL in decode, denoise and resize, so threads scale.
+    DECODE_WORKERS = os.cpu_count() or 4
+    JPEG_MAGIC = b"\xff\xd8\xff"
 
     def __init__(
         self,
         model_name="nvidia/MambaVision-L2-512-21K",
         input_res: Optional[Tuple[int, int, int]] = None,
         device: Optional[str] = None,
+        trt_engine_path: Optional[str] = None,
+        feature_cache_size: int = 4096,
     ):
         """
         Initializes the MambaVision model and transformation pipeline.
@@ -38,8 +317,14 @@ class MambaVisionModel:
             input_res: The expected input resolution (C, H, W). Uses DEFAULT_INPUT_RES if None.
             device: The device to run the model on ('cuda', 'cpu', or specific cuda device like 'cuda:0').
                     Auto-detects CUDA if None.
+            trt_engine_path: Optional path of a TensorRT engine for the model (CUDA only).
+                             The engine is loaded instead of the HF model if the file
+                             exists, and built from the HF model and saved there if not.
+                             Falls back to the HF model if TensorRT can't be used.
+            feature_cache_size: Number of feature vectors memoized by content hash.
+                                0 disables the cache.
         """
-        print(f"Initializing MambaVisionModel with model: {model_name}")
+        logger.info("Initializing MambaVisionModel with model: %s", model_name)
 
         self.input_res = input_res if input_res is not None else self.DEFAULT_INPUT_RES
         if len(self.input_res) != 3:
@@ -49,155 +334,518 @@ class MambaVisionModel:
             self.device = torch.device(device)
         else:
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"Using device: {self.device}")
+        logger.info("Using device: %s", self.device)
 
-        self.model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
-        self.model.to(self.device)
-        self.model.eval()
+        self.trt_engine = False
+        if trt_engine_path and os.path.exists(trt_engine_path):
+            try:
+                self.model = load_engine(trt_engine_path, self.device)
+                config = AutoConfig.from_pretrained(model_name, trust_remote_code=True)
+                self.trt_engine = True
+                logger.info("Loaded TensorRT engine from %s", trt_engine_path)
+            except Exception as e:
+                logger.warning(
+                    "Error loading TensorRT engine, using the HF model: %s", e
+                )
+
+        if not self.trt_engine:
+            self.model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
+            self.model.to(self.device)
+            self.model.eval()
+            config = self.model.config
+            if trt_engine_path:
+                self._build_trt_engine(trt_engine_path)
 
         self.transform = create_transform(
             input_size=self.input_res,
             is_training=False,
-            mean=getattr(self.model.config, "mean", (0.485, 0.456, 0.406)),
-            std=getattr(self.model.config, "std", (0.229, 0.224, 0.225)),
-            crop_mode=getattr(self.model.config, "crop_mode", "squash"),
-            crop_pct=getattr(self.model.config, "crop_pct", 1.0),
+            mean=getattr(config, "mean", (0.485, 0.456, 0.406)),
+            std=getattr(config, "std", (0.229, 0.224, 0.225)),
+            crop_mode=getattr(config, "crop_mode", "squash"),
+            crop_pct=getattr(config, "crop_pct", 1.0),
+        )
+        # Same eval pipeline for already-decoded uint8 CHW tensors (used for images
+        # decoded on the GPU), split in two: resize/crop run per image on uint8 like
+        # the PIL path, then scaling to [0, 1] and normalization run once per batch.
+        tensor_steps = [
+            t
+            for t in self.transform.transforms
+            if type(t).__name__ not in ("ToTensor", "MaybeToTensor")
+        ]
+        self.tensor_resize = Compose(
+            [t for t in tensor_steps if not isinstance(t, Normalize)]
+        )
+        self.tensor_normalize = Compose(
+            [ConvertImageDtype(torch.float32)]
+            + [t for t in tensor_steps if isinstance(t, Normalize)]
+        )
+        self.gpu_decode = self.device.type == "cuda"
+        # Known after the first forward pass (warm-up or first batch).
+        self.feature_dim: Optional[int] = None
+        self.compiled = False
+        # Batch bucket -> captured forward, see capture_cuda_graphs().
+        self._cuda_graphs: Dict[int, _CudaGraphEntry] = {}
+        self._cuda_graph_lock = threading.Lock()
+        self._copy_stream = (
+            torch.cuda.Stream(device=self.device)
+            if self.device.type == "cuda"
+            else None
         )
-        print("Model and transform ready.")
+        self.autocast_dtype = _autocast_dtype(self.device)
+        self._decode_pool = ThreadPoolExecutor(
+            max_workers=self.DECODE_WORKERS, thread_name_prefix="mamba-decode"
+        )
+        self._feature_cache = (
+            FeatureCache(feature_cache_size) if feature_cache_size else None
+        )
+        logger.info("Model and transform ready.")
+
+    def _build_trt_engine(self, engine_path: str) -> None:
+        """Compiles the HF model to a TensorRT engine, keeping the HF model on failure."""
+        logger.info(
+            "Building TensorRT engine at %s (this may take a while)...", engine_path
+        )
+        try:
+            with torch.inference_mode():
+                self.model = build_engine(
+                    self.model,
+                    self.input_res,
+                    BATCH_BUCKETS[-1],
+                    engine_path,
+                    self.device,
+                )
+            self.trt_engine = True
+        except Exception as e:
+            logger.warning("Error building TensorRT engine, using the HF model: %s", e)
 
     @torch.inference_mode()
-    def get_features_batch(
-        self, input_img_urls: List[str], apply_denoise: bool = True
-    ) -> Dict[str, Optional[np.ndarray]]:
+    def warmup(self, batch_size: int = 1) -> None:
+        """
+        Runs a single dummy batch through the model so any one-time graph capture
+        happens now instead of on the first real request.
         """
-        Downloads images from URLs, preprocesses them, extracts features in a batch,
-        and returns a dictionary mapping original URLs to their feature vectors (or None if processing failed).
+        dummy_batch = torch.zeros((batch_size, *self.input_res), device=self.device)
+        self.feature_dim = self.forward(dummy_batch).shape[1]
 
-        Args:
-            input_img_urls: A list of URLs pointing to images.
+    def forward(self, batch_tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Runs the model on a (N, C, H, W) batch already on self.device and returns the
+        (N, feature_dim) pooled features. This is the single entry point to the
+        (possibly compiled) model: it runs under autocast on CUDA, and compiled models
+        and TensorRT engines (whether or not compile() ran) get bucket-padded batches.
+        Callers cast the result to float32.
+        """
+        with self._autocast():
+            if self._cuda_graphs:
+                # The graphs share static buffers, so replay and clone one at a time.
+                with self._cuda_graph_lock:
+                    return _run_in_buckets(self._replay_cuda_graph, {"x": batch_tensor})
+            # An engine only accepts batches up to its max shape (the largest bucket).
+            if self.compiled or self.trt_engine:
+                return _run_in_buckets(lambda x: self.model(x)[0], {"x": batch_tensor})
+            batch_features, _ = self.model(batch_tensor)
+            return batch_features
+
+    def _replay_cuda_graph(self, x: torch.Tensor) -> torch.Tensor:
+        """Runs a bucket-sized batch through its captured graph."""
+        graph, static_input, static_output = self._cuda_graphs[x.shape[0]]
+        static_input.copy_(x)
+        graph.replay()
+        return static_output
+
+    @torch.inference_mode()
+    def capture_cuda_graphs(self) -> bool:
+        """
+        Captures the eager forward as one CUDA graph per batch bucket, each with its
+        own static input and output, sharing one memory pool. Used when the model
+        can't be compiled, so batches still replay without per-kernel launch
+        overhead.
 
         Returns:
-            A dictionary where keys are the input URLs and values are the
-            corresponding feature vectors as NumPy arrays (shape: [feature_dim]),
-            or None if an image could not be processed.
+            True if the graphs are in use, False if not on CUDA or capture failed.
         """
-        processed_tensors = []
-        url_order = []
-        results = {url: None for url in input_img_urls}
+        if self.device.type != "cuda":
+            return False
 
-        for url in input_img_urls:
-            try:
-                response = requests.get(
-                    url, stream=True, timeout=10, headers=self.REQUESTS_HEADERS
+        graphs: Dict[int, _CudaGraphEntry] = {}
+        pool = torch.cuda.graph_pool_handle()
+        current_stream = torch.cuda.current_stream(self.device)
+        try:
+            # Largest first, so the smaller graphs fit in the memory it reserves.
+            for batch_size in reversed(BATCH_BUCKETS):
+                static_input = torch.zeros(
+                    (batch_size, *self.input_res), device=self.device
                 )
-                response.raise_for_status()
+                # Warm up on a side stream, as capture requires.
+                side_stream = torch.cuda.Stream(device=self.device)
+                side_stream.wait_stream(current_stream)
+                with torch.cuda.stream(side_stream), self._autocast():
+                    for _ in range(2):
+                        self.model(static_input)
+                current_stream.wait_stream(side_stream)
+
+                graph = torch.cuda.CUDAGraph()
+                with torch.cuda.graph(graph, pool=pool), self._autocast():
+                    static_output = self.model(static_input)[0]
+                graphs[batch_size] = (graph, static_input, static_output)
+        except Exception as e:
+            logger.warning("Error capturing MambaVision CUDA graphs: %s", e)
+            return False
 
-                image = Image.open(BytesIO(response.content)).convert("RGB")
+        self._cuda_graphs = graphs
+        self.feature_dim = graphs[BATCH_BUCKETS[0]][2].shape[1]
+        return True
 
-                if apply_denoise:
-                    logger.debug(f"Applying denoising to image from {url}")
-                    image = denoise_image_bilateral(image)
+    def _autocast(self) -> torch.autocast:
+        """
+        Returns a fresh mixed-precision context (enabled on CUDA only). A new context
+        is created per call because autocast contexts must not be shared across threads.
+        """
+        return torch.autocast(
+            device_type=self.device.type,
+            dtype=self.autocast_dtype,
+            enabled=self.device.type == "cuda",
+        )
 
-                input_tensor = self.transform(image)
-                processed_tensors.append(input_tensor)
-                url_order.append(url)
+    def compile(self, mode: str = "reduce-overhead") -> bool:
+        """
+        Wraps the model forward with torch.compile and warms it up for every batch
+        bucket. A full graph (required for CUDA graphs to cover the whole forward) is
+        tried first, then a graph with breaks.
 
-            except requests.exceptions.RequestException as e:
-                print(f"Error downloading {url}: {e}")
-            except (IOError, Image.UnidentifiedImageError) as e:
-                print(f"Error opening or processing image {url}: {e}")
-            except Exception as e:
-                print(f"Unexpected error processing {url}: {e}")
+        Args:
+            mode: The torch.compile mode to use.
 
-        if not processed_tensors:
-            print("No images could be processed successfully.")
-            return results
+        Returns:
+            True if the compiled model is in use, False if it fell back to eager mode.
+        """
+        if self.trt_engine:
+            # Already compiled ahead of time. Still bucket the batches so they stay
+            # within the engine's max batch size and hit its tuned shapes.
+            for batch_size in BATCH_BUCKETS:
+                self.warmup(batch_size)
+            self.compiled = True
+            return True
+
+        _ensure_compile_cache_limit()
+        eager_model = self.model
+        for fullgraph in (True, False):
+            try:
+                self.model = torch.compile(
+                    eager_model, mode=mode, dynamic=False, fullgraph=fullgraph
+                )
+                for batch_size in BATCH_BUCKETS:
+                    self.warmup(batch_size)
+            except Exception as e:
+                logger.warning(
+                    "Error compiling MambaVision model (fullgraph=%s): %s", fullgraph, e
+                )
+                self.model = eager_model
+                continue
+            self.compiled = True
+            return True
+        if self.capture_cuda_graphs():
+            logger.info("MambaVision model replays captured CUDA graphs instead.")
+            return True
+        logger.warning("MambaVision model falling back to eager mode.")
+        return False
+
+    def quantize(self) -> bool:
+        """
+        Quantizes the model's Linear layers to INT8. Must run before compile().
 
+        Returns:
+            True if the quantized model is in use, False if it kept its original weights.
+        """
+        if self.trt_engine:
+            logger.info(
+                "MambaVision model runs as a TensorRT engine, skipping quantization."
+            )
+            return False
         try:
-            batch_tensor = torch.stack(processed_tensors).to(self.device)
-            print(f"Processing batch of size: {batch_tensor.size(0)}")
+            self.model = quantize_linear_layers(self.model, self.device)
         except Exception as e:
-            print(f"Error stacking tensors: {e}")
+            logger.warning(
+                "Error quantizing MambaVision model, keeping original weights: %s", e
+            )
+            return False
+        return True
+
+    def get_features_batch(
+        self,
+        input_img_urls: List[str],
+        apply_denoise: bool = True,
+        as_numpy: bool = True,
+    ) -> Tuple[Union[np.ndarray, torch.Tensor], np.ndarray]:
+        """
+        Downloads images from URLs, preprocesses them, and extracts features in a batch.
+        Lists longer than the largest batch bucket are processed in chunks, with
+        downloading and decoding overlapped with inference.
+
+        Args:
+            input_img_urls: A list of URLs pointing to images.
+            as_numpy: Whether to copy the features to a host array. If False they are
+                      returned as a tensor on self.device (e.g. for a GPU index).
 
-            return results
+        Returns:
+            A (len(input_img_urls), feature_dim) float32 feature matrix in input order
+            and a boolean mask that is False for images that could not be processed.
+        """
+        if as_numpy and len(input_img_urls) > BATCH_BUCKETS[-1]:
+            return _pipelined_features_from_urls(self, input_img_urls, apply_denoise)
+        image_bytes_list = download_media_batch(
+            input_img_urls,
+            timeout=self.DOWNLOAD_TIMEOUT,
+            max_workers=self.DOWNLOAD_WORKERS,
+        )
+        return self.get_features_batch_from_bytes(
+            image_bytes_list, apply_denoise, as_numpy=as_numpy
+        )
+
+    def decode_batch(
+        self, image_bytes_list: List[Optional[bytes]], apply_denoise: bool = True
+    ) -> Tuple[Optional[torch.Tensor], List[int]]:
+        """
+        Decodes, optionally denoises, and transforms encoded images into one batch tensor.
+
+        On CUDA, JPEGs are decoded and transformed on the GPU with nvJPEG when no
+        denoising is requested (the bilateral filter only runs on the CPU); the batch
+        is then built on the device. Otherwise images are decoded with PIL and the
+        batch lives in pinned host memory so it can be copied to the GPU asynchronously.
+
+        Args:
+            image_bytes_list: A list of encoded images. None entries are skipped.
+            apply_denoise: Whether to apply bilateral denoising before the transform.
+
+        Returns:
+            The (N, C, H, W) batch tensor (None if no image could be decoded) and the
+            input index of each of its rows.
+        """
+        cpu_work = []
+        jpeg_work = []
+        use_gpu_decode = self.gpu_decode and not apply_denoise
+
+        for i, image_bytes in enumerate(image_bytes_list):
+            if not image_bytes:
+                continue
+            if use_gpu_decode and image_bytes.startswith(self.JPEG_MAGIC):
+                jpeg_work.append((i, image_bytes))
+            else:
+                cpu_work.append((i, image_bytes))
+
+        gpu_batch: Optional[torch.Tensor] = None
+        gpu_indices: List[int] = []
+        if jpeg_work:
+            try:
+                gpu_batch = self.decode_jpegs_on_gpu(
+                    [image_bytes for _, image_bytes in jpeg_work]
+                )
+                gpu_indices = [i for i, _ in jpeg_work]
+            except Exception as e:
+                logger.warning("GPU JPEG decoding failed, falling back to PIL: %s", e)
+                cpu_work.extend(jpeg_work)
+
+        # CPU images are decoded in parallel, then copied into rows of one
+        # preallocated (pinned on CUDA) batch instead of being stacked afterwards.
+        cpu_indices: List[int] = []
+        host_batch = None
+        if cpu_work:
+            host_batch = torch.empty(
+                (len(cpu_work), *self.input_res),
+                pin_memory=self.device.type == "cuda",
+            )
+            decoded = self._decode_pool.map(
+                lambda work: self._decode_on_cpu(*work, apply_denoise), cpu_work
+            )
+            for (i, _), input_tensor in zip(cpu_work, decoded):
+                if input_tensor is not None:
+                    host_batch[len(cpu_indices)].copy_(input_tensor)
+                    cpu_indices.append(i)
+            host_batch = host_batch[: len(cpu_indices)]
+
+        if gpu_batch is None:
+            if not cpu_indices:
+                return None, []
+            return host_batch, cpu_indices
+        if not cpu_indices:
+            return gpu_batch, gpu_indices
+
+        batch_tensor = torch.cat(
+            [gpu_batch, host_batch.to(self.device, non_blocking=True)]
+        )
+        return batch_tensor, gpu_indices + cpu_indices
 
+    def _decode_on_cpu(
+        self, i: int, image_bytes: bytes, apply_denoise: bool
+    ) -> Optional[torch.Tensor]:
+        """Decodes one image with PIL and applies the eval transform. None on failure."""
         try:
+            if apply_denoise:
+                # Decode and denoise with OpenCV, then transform the array as a
+                # tensor, skipping the PIL <-> numpy round trips.
+                denoised = decode_image_bilateral(image_bytes)
+                if denoised is not None:
+                    image_tensor = torch.from_numpy(denoised).permute(2, 0, 1)
+                    return self.tensor_normalize(self.tensor_resize(image_tensor))
 
-            batch_features, _ = self.model(batch_tensor)
+            image = Image.open(BytesIO(image_bytes)).convert("RGB")
 
-            feature_vectors_np = batch_features.detach().cpu().numpy()
+            if apply_denoise:
+                logger.debug("Applying denoising to image %s", i)
+                image = denoise_image_bilateral(image)
 
-            for i, url in enumerate(url_order):
-                results[url] = feature_vectors_np[i]
+            return self.transform(image)
 
+        except (IOError, Image.UnidentifiedImageError) as e:
+            logger.warning("Error opening or processing image %s: %s", i, e)
         except Exception as e:
-            print(f"Error during model inference or feature processing: {e}")
+            logger.error("Unexpected error processing image %s: %s", i, e)
+        return None
 
-        return results
+    def decode_jpegs_on_gpu(self, jpeg_bytes_list: List[bytes]) -> torch.Tensor:
+        """
+        Decodes a list of JPEGs on the GPU with nvJPEG and applies the eval transform
+        there. Raises if any image cannot be decoded, so the caller can fall back to PIL.
 
-    def get_features_batch_from_bytes(
-        self, image_bytes_list: List[bytes], apply_denoise: bool = True
-    ) -> List[Optional[np.ndarray]]:
-        processed_tensors = []
-        results = {f"uploaded_image_{i}": None for i in range(len(image_bytes_list))}
+        Args:
+            jpeg_bytes_list: A list of encoded JPEG images.
 
-        for image_bytes in image_bytes_list:
-            try:
-                image = Image.open(BytesIO(image_bytes)).convert("RGB")
+        Returns:
+            The transformed (N, C, H, W) float32 batch, on self.device.
+        """
+        encoded = [
+            torch.frombuffer(bytearray(jpeg_bytes), dtype=torch.uint8)
+            for jpeg_bytes in jpeg_bytes_list
+        ]
+        decoded = decode_jpeg(encoded, mode=ImageReadMode.RGB, device=self.device)
+        resized = torch.stack([self.tensor_resize(image) for image in decoded])
+        return self.tensor_normalize(resized)
 
-                if apply_denoise:
-                    logger.debug(f"Applying denoising to image from {url}")
-                    image = denoise_image_bilateral(image)
+    @torch.inference_mode()
+    def get_features_from_batch(
+        self,
+        batch_tensor: torch.Tensor,
+        rows: Optional[List[int]] = None,
+        num_rows: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+        as_numpy: bool = True,
+    ) -> Union[np.ndarray, torch.Tensor]:
+        """
+        Runs the model on a batch produced by decode_batch.
 
-                input_tensor = self.transform(image)
-                processed_tensors.append(input_tensor)
+        Args:
+            batch_tensor: The (N, C, H, W) batch tensor, on the host or the device.
+            rows: Output row of each batch entry. Defaults to 0..N-1.
+            num_rows: Number of output rows. Defaults to N.
+            out: Optional (num_rows, feature_dim) float32 array to write into.
+            as_numpy: If False, skip the D2H copy and return a tensor on self.device.
 
-            except (IOError, Image.UnidentifiedImageError) as e:
-                print(f"Error opening or processing image {url}: {e}")
-            except Exception as e:
-                print(f"Unexpected error processing {url}: {e}")
+        Returns:
+            The (num_rows, feature_dim) float32 feature matrix (`out` if given).
+        """
+        if batch_tensor.device != self.device:
+            batch_tensor = _copy_to_device(
+                {"x": batch_tensor}, self.device, self._copy_stream
+            )["x"]
+        batch_features = self.forward(batch_tensor)
+        self.feature_dim = batch_features.shape[1]
+        batch_size = batch_features.shape[0]
+        num_rows = num_rows if num_rows is not None else batch_size
+        rows = rows if rows is not None else list(range(batch_size))
+        if not as_numpy:
+            return _scatter_rows(batch_features, num_rows, rows)
+        return _features_to_host(batch_features, num_rows, rows, out)
+
+    @torch.inference_mode()
+    def get_features_batch_from_bytes(
+        self,
+        image_bytes_list: List[Optional[bytes]],
+        apply_denoise: bool = True,
+        out: Optional[np.ndarray] = None,
+        as_numpy: bool = True,
+    ) -> Tuple[Union[np.ndarray, torch.Tensor], np.ndarray]:
+        """
+        Decodes images from raw bytes, preprocesses them, and extracts features in a batch.
+
+        Args:
+            image_bytes_list: A list of encoded images.
+            out: Optional (len(image_bytes_list), feature_dim) float32 array that the
+                 features are copied into, avoiding a separate result allocation.
+            as_numpy: Whether to copy the features to the host. If False they are
+                      returned as a tensor on self.device and `out` is ignored.
+
+        Returns:
+            A (len(image_bytes_list), feature_dim) float32 feature matrix in input order
+            (`out` if given) and a boolean mask that is False for entries that were None
+            or failed. The contents of masked-out rows are unspecified.
+        """
+        if self._feature_cache is not None and as_numpy:
+            return self._feature_cache.extract(
+                lambda misses, out: self._extract_from_bytes(
+                    misses, apply_denoise, out
+                ),
+                image_bytes_list,
+                apply_denoise,
+                out,
+            )
+        return self._extract_from_bytes(image_bytes_list, apply_denoise, out, as_numpy)
 
-        if not processed_tensors:
-            print("No images could be processed successfully.")
-            return results
+    def _extract_from_bytes(
+        self,
+        image_bytes_list: List[Optional[bytes]],
+        apply_denoise: bool,
+        out: Optional[np.ndarray] = None,
+        as_numpy: bool = True,
+    ) -> Tuple[Union[np.ndarray, torch.Tensor], np.ndarray]:
+        """get_features_batch_from_bytes without the feature cache."""
+        num_inputs = len(image_bytes_list)
+        no_features_device = None if as_numpy else self.device
 
         try:
-            batch_tensor = torch.stack(processed_tensors).to(self.device)
-            print(f"Processing batch of size: {batch_tensor.size(0)}")
+            batch_tensor, processed_indices = self.decode_batch(
+                image_bytes_list, apply_denoise
+            )
         except Exception as e:
-            print(f"Error stacking tensors: {e}")
+            logger.error("Error building image batch: %s", e)
 
-            return results
+            return _no_features(num_inputs, out, no_features_device)
 
-        try:
+        if batch_tensor is None:
+            logger.warning("No images could be processed successfully.")
+            return _no_features(num_inputs, out, no_features_device)
 
-            batch_features, _ = self.model(batch_tensor)
+        logger.debug("Processing batch of size: %s", batch_tensor.size(0))
 
-            feature_vectors_np = batch_features.detach().cpu().numpy()
+        try:
 
-            for i in range(len(image_bytes_list)):
-                results[f"uploaded_image{i}"] = feature_vectors_np[i]
+            features = self.get_features_from_batch(
+                batch_tensor, processed_indices, num_inputs, out, as_numpy
+            )
+            ok_mask = np.zeros(num_inputs, dtype=bool)
+            ok_mask[processed_indices] = True
+            return features, ok_mask
 
         except Exception as e:
-            print(f"Error during model inference or feature processing: {e}")
+            logger.error("Error during model inference or feature processing: %s", e)
 
-        return results
+        return _no_features(num_inputs, out, no_features_device)
 
 
 class CLAPModel:
 
     DEFAULT_MODEL_NAME = "laion/larger_clap_general"
     DEFAULT_PROCESSOR_NAME = "laion/larger_clap_general"
-
-    REQUESTS_HEADERS = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
+    DOWNLOAD_TIMEOUT = 15
+    DOWNLOAD_WORKERS = 16
+    # PIL/NumPy release the GIL in decode, denoise and resize, so threads scale.
+    DECODE_WORKERS = os.cpu_count() or 4
 
     def __init__(
         self,
         model_name: str = DEFAULT_MODEL_NAME,
         processor_name: str = DEFAULT_PROCESSOR_NAME,
         device: Optional[str] = None,
+        feature_cache_size: int = 4096,
     ):
         """
         Initializes the CLAP model and processor.
@@ -207,208 +855,393 @@ class CLAPModel:
             processor_name: The name of the CLAP processor on Hugging Face Hub.
             device: The device to run the model on ('cuda', 'cpu', or specific cuda device like 'cuda:0').
                     Auto-detects CUDA if None.
+            feature_cache_size: Number of feature vectors memoized by content hash.
+                                0 disables the cache.
         """
-        print(
-            f"Initializing CLAPModel with model: {model_name}, processor: {processor_name}"
+        logger.info(
+            "Initializing CLAPModel with model: %s, processor: %s",
+            model_name,
+            processor_name,
         )
 
         if device:
             self.device = torch.device(device)
         else:
             self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        print(f"Using device: {self.device}")
+        logger.info("Using device: %s", self.device)
 
         try:
             self.model = ClapModel.from_pretrained(model_name).to(self.device)
             self.processor = ClapProcessor.from_pretrained(processor_name)
             self.target_sampling_rate = self.processor.feature_extractor.sampling_rate
-            print(f"Target sampling rate: {self.target_sampling_rate}")
+            logger.info("Target sampling rate: %s", self.target_sampling_rate)
         except Exception as e:
-            print(f"Error loading model/processor: {e}")
+            logger.error("Error loading model/processor: %s", e)
             raise
 
         self.model.eval()
-        print("CLAP Model and processor ready.")
+        self.feature_dim: Optional[int] = getattr(
+            self.model.config, "projection_dim", None
+        )
+        self.compiled = False
+        self._copy_stream = (
+            torch.cuda.Stream(device=self.device)
+            if self.device.type == "cuda"
+            else None
+        )
+        self.autocast_dtype = _autocast_dtype(self.device)
+        self._decode_pool = ThreadPoolExecutor(
+            max_workers=self.DECODE_WORKERS, thread_name_prefix="clap-decode"
+        )
+        self._feature_cache = (
+            FeatureCache(feature_cache_size) if feature_cache_size else None
+        )
+        logger.info("CLAP Model and processor ready.")
 
     @torch.inference_mode()
-    def get_features_batch(
-        self, input_audio_urls: List[str], apply_denoise: bool = True
-    ) -> Dict[str, Optional[np.ndarray]]:
+    def warmup(self, batch_size: int = 1) -> None:
         """
-        Downloads audio from URLs, preprocesses them using the CLAP processor,
-        extracts audio features (embeddings) in a batch, and returns a dictionary
-        mapping original URLs to their feature vectors (or None if processing failed).
+        Runs one second of silence through the model so any one-time graph capture
+        happens now instead of on the first real request.
+        """
+        dummy_waveform = np.zeros(self.target_sampling_rate, dtype=np.float32)
+        inputs = self.processor(
+            audios=[dummy_waveform] * batch_size,
+            return_tensors="pt",
+            sampling_rate=self.target_sampling_rate,
+            padding=True,
+        ).to(self.device)
+        self.forward(dict(inputs))
+
+    def forward(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """
+        Runs the audio branch on processor outputs already on self.device and returns
+        the (N, feature_dim) audio embeddings. This is the single entry point to the
+        (possibly compiled) forward: it runs under autocast on CUDA, and compiled
+        forwards get bucket-padded batches. Callers cast the result to float32.
+        """
+        with self._autocast():
+            if self.compiled:
+                return _run_in_buckets(self.model.get_audio_features, inputs)
+            return self.model.get_audio_features(**inputs)
+
+    def _autocast(self) -> torch.autocast:
+        """
+        Returns a fresh mixed-precision context (enabled on CUDA only). A new context
+        is created per call because autocast contexts must not be shared across threads.
+        """
+        return torch.autocast(
+            device_type=self.device.type,
+            dtype=self.autocast_dtype,
+            enabled=self.device.type == "cuda",
+        )
+
+    def compile(self, mode: str = "reduce-overhead") -> bool:
+        """
+        Wraps the model's audio feature forward with torch.compile and warms it up for
+        every batch bucket. A full graph is tried first, then a graph with breaks.
 
         Args:
-            input_audio_urls: A list of URLs pointing to audio files (e.g., .wav, .mp3).
+            mode: The torch.compile mode to use.
 
         Returns:
-            A dictionary where keys are the input URLs and values are the
-            corresponding audio feature vectors as NumPy arrays (shape: [feature_dim]),
-            or None if an audio file could not be processed.
+            True if the compiled forward is in use, False if it fell back to eager mode.
         """
-        raw_audio_data = []
-        url_order = []
-        results = {url: None for url in input_audio_urls}
-
-        for url in input_audio_urls:
+        _ensure_compile_cache_limit()
+        eager_forward = self.model.get_audio_features
+        for fullgraph in (True, False):
             try:
-                print(f"Processing URL: {url}")
-                response = requests.get(
-                    url, stream=True, timeout=15, headers=self.REQUESTS_HEADERS
+                self.model.get_audio_features = torch.compile(
+                    eager_forward, mode=mode, dynamic=False, fullgraph=fullgraph
                 )
-                response.raise_for_status()
-
-                audio_waveform, original_sr = librosa.load(
-                    BytesIO(response.content), sr=None, mono=True
+                for batch_size in BATCH_BUCKETS:
+                    self.warmup(batch_size)
+            except Exception as e:
+                logger.warning(
+                    "Error compiling CLAP model (fullgraph=%s): %s", fullgraph, e
                 )
+                self.model.__dict__.pop("get_audio_features", None)
+                continue
+            self.compiled = True
+            return True
+        logger.warning("CLAP model falling back to eager mode.")
+        return False
+
+    def quantize(self) -> bool:
+        """
+        Quantizes the model's Linear layers to INT8. Must run before compile().
 
-                if original_sr != self.target_sampling_rate:
-                    print(
-                        f"Resampling {url} from {original_sr} Hz to {self.target_sampling_rate} Hz"
-                    )
-                    audio_waveform = librosa.resample(
-                        audio_waveform,
-                        orig_sr=original_sr,
-                        target_sr=self.target_sampling_rate,
-                    )
-
-                if apply_denoise:
-                    logger.debug(f"Applying denoising to audio from {url}")
-                    audio_waveform = denoise_audio_spectral_gate(
-                        audio_waveform, sampling_rate=self.target_sampling_rate
-                    )
-
-                raw_audio_data.append(audio_waveform)
-                url_order.append(url)
-                print(f"Successfully loaded and preprocessed: {url}")
+        Returns:
+            True if the quantized model is in use, False if it kept its original weights.
+        """
+        try:
+            self.model = quantize_linear_layers(self.model, self.device)
+        except Exception as e:
+            logger.warning(
+                "Error quantizing CLAP model, keeping original weights: %s", e
+            )
+            return False
+        return True
 
-            except requests.exceptions.RequestException as e:
-                print(f"Error downloading {url}: {e}")
-            except (sf.SoundFileError, RuntimeError, TypeError, ValueError) as e:
+    def get_features_batch(
+        self, input_audio_urls: List[str], apply_denoise: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Downloads audio from URLs, preprocesses them using the CLAP processor,
+        and extracts audio features (embeddings) in a batch.
+        Lists longer than the largest batch bucket are processed in chunks, with
+        downloading and decoding overlapped with inference.
 
-                print(f"Error loading/processing audio data from {url}: {e}")
-            except Exception as e:
-                print(f"Unexpected error processing {url}: {e}")
+        Args:
+            input_audio_urls: A list of URLs pointing to audio files (e.g., .wav, .mp3).
 
-        if not raw_audio_data:
-            print("No audio files could be processed successfully.")
-            return results
+        Returns:
+            A (len(input_audio_urls), feature_dim) float32 feature matrix in input
+            order and a boolean mask that is False for files that could not be processed.
+        """
+        if len(input_audio_urls) > BATCH_BUCKETS[-1]:
+            return _pipelined_features_from_urls(self, input_audio_urls, apply_denoise)
+        audio_bytes_list = download_media_batch(
+            input_audio_urls,
+            timeout=self.DOWNLOAD_TIMEOUT,
+            max_workers=self.DOWNLOAD_WORKERS,
+        )
+        return self.get_features_batch_from_bytes(audio_bytes_list, apply_denoise)
 
-        try:
-            print(f"Processing batch of size: {len(raw_audio_data)}")
+    def decode_batch(
+        self, audio_bytes_list: List[Optional[bytes]], apply_denoise: bool = True
+    ) -> Tuple[Optional[Dict[str, torch.Tensor]], List[int]]:
+        """
+        Decodes, resamples, optionally denoises, and featurizes encoded audio files
+        with the CLAP processor. On CUDA the waveforms are denoised together in one
+        batched GPU pass, and the processor outputs are moved to pinned host memory
+        so they can be copied to the GPU asynchronously.
 
-            inputs = self.processor(
-                audios=raw_audio_data,
-                return_tensors="pt",
-                sampling_rate=self.target_sampling_rate,
-                padding=True,
-            )
+        Args:
+            audio_bytes_list: A list of encoded audio files. None entries are skipped.
+            apply_denoise: Whether to apply spectral gate denoising.
 
-            inputs = inputs.to(self.device)
-            print("Batch processed by CLAP processor.")
+        Returns:
+            The processor outputs for the batch (None if no file could be decoded) and
+            the input index of each batch row.
+        """
+        work = [
+            (i, audio_bytes)
+            for i, audio_bytes in enumerate(audio_bytes_list)
+            if audio_bytes
+        ]
+        batch_denoise = apply_denoise and self.device.type == "cuda"
+        decoded = self._decode_pool.map(
+            lambda item: self._decode_audio(*item, apply_denoise and not batch_denoise),
+            work,
+        )
+        raw_audio_data = []
+        processed_indices = []
+        for (i, _), audio_waveform in zip(work, decoded):
+            if audio_waveform is not None:
+                raw_audio_data.append(audio_waveform)
+                processed_indices.append(i)
 
-        except Exception as e:
-            print(f"Error during CLAP processing stage: {e}")
+        if not raw_audio_data:
+            return None, processed_indices
 
-            return results
+        if batch_denoise:
+            raw_audio_data = self._denoise_batch(raw_audio_data)
 
+        inputs = self.processor(
+            audios=raw_audio_data,
+            return_tensors="pt",
+            sampling_rate=self.target_sampling_rate,
+            padding=True,
+        )
+        pin = self.device.type == "cuda"
+        inputs = {
+            name: tensor.pin_memory() if pin else tensor
+            for name, tensor in inputs.items()
+        }
+        logger.debug("Batch processed by CLAP processor.")
+
+        return inputs, processed_indices
+
+    def _decode_audio(
+        self, i: int, audio_bytes: bytes, apply_denoise: bool
+    ) -> Optional[np.ndarray]:
+        """Decodes, resamples and optionally denoises one audio file. None on failure."""
         try:
-            print("Extracting features using CLAP model...")
-
-            audio_features = self.model.get_audio_features(**inputs)
-            print(f"Extracted features shape: {audio_features.shape}")
+            audio_waveform, original_sr = self._load_audio(audio_bytes)
+
+            if original_sr != self.target_sampling_rate:
+                logger.debug(
+                    "Resampling audio %s from %s Hz to %s Hz",
+                    i,
+                    original_sr,
+                    self.target_sampling_rate,
+                )
+                audio_waveform = soxr.resample(
+                    audio_waveform,
+                    original_sr,
+                    self.target_sampling_rate,
+                    quality="HQ",
+                )
 
-            feature_vectors_np = audio_features.detach().cpu().numpy()
+            if apply_denoise:
+                logger.debug("Applying denoising to audio %s", i)
+                audio_waveform = denoise_audio_spectral_gate(
+                    audio_waveform, sampling_rate=self.target_sampling_rate
+                )
 
-            for i, url in enumerate(url_order):
-                results[url] = feature_vectors_np[i]
-            print("Mapped features back to URLs.")
+            logger.debug("Successfully loaded and preprocessed audio %s", i)
+            return audio_waveform
 
+        except (sf.SoundFileError, RuntimeError, TypeError, ValueError) as e:
+            logger.warning("Error loading/processing audio data %s: %s", i, e)
         except Exception as e:
-            print(f"Error during model inference or feature post-processing: {e}")
-
-        return results
+            logger.error("Unexpected error processing audio %s: %s", i, e)
+        return None
 
-    def get_features_batch_from_bytes(
-        self, audio_bytes_list: List[bytes], apply_denoise: bool = True
-    ) -> List[Optional[np.ndarray]]:
-        raw_audio_data = []
-        results = {f"uploaded_audio{i}": None for i in range(len(audio_bytes_list))}
-
-        for audio_bytes in audio_bytes_list:
-            try:
+    def _denoise_batch(self, waveforms: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Spectral-gate denoises all waveforms in one batched torch.stft pass on the
+        GPU: they are zero-padded to a common length, copied over once, and sliced
+        back to their original lengths afterwards.
+        """
+        lengths = [len(waveform) for waveform in waveforms]
+        padded = pad_sequence(
+            [torch.from_numpy(waveform) for waveform in waveforms], batch_first=True
+        )
+        denoised = denoise_audio_spectral_gate_torch(
+            padded.pin_memory().to(self.device, non_blocking=True),
+            sampling_rate=self.target_sampling_rate,
+        ).cpu()
+        return [row[:length].numpy() for row, length in zip(denoised, lengths)]
+
+    @staticmethod
+    def _load_audio(audio_bytes: bytes) -> Tuple[np.ndarray, int]:
+        """
+        Decodes an audio file to a mono float32 waveform at its native sampling rate.
+        libsndfile is used directly; librosa (audioread) is only the fallback for
+        formats libsndfile can't read.
+        """
+        try:
+            audio_waveform, sr = sf.read(
+                BytesIO(audio_bytes), dtype="float32", always_2d=True
+            )
+            return audio_waveform.mean(axis=1), sr
+        except sf.SoundFileError:
+            return librosa.load(BytesIO(audio_bytes), sr=None, mono=True)
 
-                audio_waveform, original_sr = librosa.load(
-                    BytesIO(audio_bytes), sr=None, mono=True
-                )
+    @torch.inference_mode()
+    def get_features_from_batch(
+        self,
+        inputs: Dict[str, torch.Tensor],
+        rows: Optional[List[int]] = None,
+        num_rows: Optional[int] = None,
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Runs the model on processor outputs produced by decode_batch.
 
-                if original_sr != self.target_sampling_rate:
-                    print(
-                        f"Resampling {url} from {original_sr} Hz to {self.target_sampling_rate} Hz"
-                    )
-                    audio_waveform = librosa.resample(
-                        audio_waveform,
-                        orig_sr=original_sr,
-                        target_sr=self.target_sampling_rate,
-                    )
+        Args:
+            inputs: The host tensors returned by decode_batch.
+            rows: Output row of each batch entry. Defaults to 0..N-1.
+            num_rows: Number of output rows. Defaults to N.
+            out: Optional (num_rows, feature_dim) float32 array to write into.
 
-                if apply_denoise:
-                    logger.debug(f"Applying denoising to audio from {url}")
-                    audio_waveform = denoise_audio_spectral_gate(
-                        audio_waveform, sampling_rate=self.target_sampling_rate
-                    )
+        Returns:
+            The (num_rows, feature_dim) float32 feature matrix (`out` if given).
+        """
+        inputs = _copy_to_device(inputs, self.device, self._copy_stream)
+        audio_features = self.forward(inputs)
+        logger.debug("Extracted features shape: %s", audio_features.shape)
+        self.feature_dim = audio_features.shape[1]
+        batch_size = audio_features.shape[0]
+        return _features_to_host(
+            audio_features,
+            num_rows if num_rows is not None else batch_size,
+            rows if rows is not None else list(range(batch_size)),
+            out,
+        )
 
-                raw_audio_data.append(audio_waveform)
-                print(f"Successfully loaded and preprocessed: {url}")
+    @torch.inference_mode()
+    def get_features_batch_from_bytes(
+        self,
+        audio_bytes_list: List[Optional[bytes]],
+        apply_denoise: bool = True,
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decodes audio files from raw bytes, preprocesses them using the CLAP processor,
+        and extracts audio features in a batch.
 
-            except (sf.SoundFileError, RuntimeError, TypeError, ValueError) as e:
+        Args:
+            audio_bytes_list: A list of encoded audio files.
+            out: Optional (len(audio_bytes_list), feature_dim) float32 array that the
+                 features are copied into, avoiding a separate result allocation.
 
-                print(f"Error loading/processing audio data from {url}: {e}")
-            except Exception as e:
-                print(f"Unexpected error processing {url}: {e}")
+        Returns:
+            A (len(audio_bytes_list), feature_dim) float32 feature matrix in input order
+            (`out` if given) and a boolean mask that is False for entries that were None
+            or failed. The contents of masked-out rows are unspecified.
+        """
+        if self._feature_cache is not None:
+            return self._feature_cache.extract(
+                lambda misses, out: self._extract_from_bytes(
+                    misses, apply_denoise, out
+                ),
+                audio_bytes_list,
+                apply_denoise,
+                out,
+            )
+        return self._extract_from_bytes(audio_bytes_list, apply_denoise, out)
 
-        if not raw_audio_data:
-            print("No audio files could be processed successfully.")
-            return results
+    def _extract_from_bytes(
+        self,
+        audio_bytes_list: List[Optional[bytes]],
+        apply_denoise: bool,
+        out: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """get_features_batch_from_bytes without the feature cache."""
+        num_inputs = len(audio_bytes_list)
 
         try:
-            print(f"Processing batch of size: {len(raw_audio_data)}")
-
-            inputs = self.processor(
-                audios=raw_audio_data,
-                return_tensors="pt",
-                sampling_rate=self.target_sampling_rate,
-                padding=True,
+            inputs, processed_indices = self.decode_batch(
+                audio_bytes_list, apply_denoise
             )
-
-            inputs = inputs.to(self.device)
-            print("Batch processed by CLAP processor.")
-
         except Exception as e:
-            print(f"Error during CLAP processing stage: {e}")
+            logger.error("Error during CLAP processing stage: %s", e)
 
-            return results
+            return _no_features(num_inputs, out)
 
-        try:
-            print("Extracting features using CLAP model...")
+        if inputs is None:
+            logger.warning("No audio files could be processed successfully.")
+            return _no_features(num_inputs, out)
 
-            audio_features = self.model.get_audio_features(**inputs)
-            print(f"Extracted features shape: {audio_features.shape}")
+        logger.debug("Processing batch of size: %s", len(processed_indices))
 
-            feature_vectors_np = audio_features.detach().cpu().numpy()
+        try:
+            logger.debug("Extracting features using CLAP model...")
 
-            for i in range(len(audio_bytes_list)):
-                results[f"uploaded_audio_{i}"] = feature_vectors_np[i]
-            print("Mapped features back to URLs.")
+            features = self.get_features_from_batch(
+                inputs, processed_indices, num_inputs, out
+            )
+            ok_mask = np.zeros(num_inputs, dtype=bool)
+            ok_mask[processed_indices] = True
+            logger.debug("Mapped features back to inputs.")
+            return features, ok_mask
 
         except Exception as e:
-            print(f"Error during model inference or feature post-processing: {e}")
+            logger.error(
+                "Error during model inference or feature post-processing: %s", e
+            )
 
-        return results
+        return _no_features(num_inputs, out)
 
 
 if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - [%(name)s] - %(message)s",
+    )
     print("--- MambaVision Example Usage ---")
     processor = MambaVisionModel()
 
@@ -420,11 +1253,11 @@ if __name__ == "__main__":
         "https://rawhubusercontent.com/pytorch/pytorch/main/README.md",
     ]
 
-    extracted_features = processor.get_features_batch(image_urls)
+    features_arr, ok_mask = processor.get_features_batch(image_urls)
 
     print("\n--- Extraction Results ---")
-    for url, features in extracted_features.items():
-        if features is not None:
+    for url, features, ok in zip(image_urls, features_arr, ok_mask):
+        if ok:
             print(f"URL: {url}, Feature Vector Shape: {features.shape}")
         else:
             print(f"URL: {url}, Failed to extract features.")
@@ -434,9 +1267,9 @@ if __name__ == "__main__":
     more_urls = [
         "https://images.pexels.com/photos/876466/pexels-photo-876466.jpeg?auto=compress&cs=tinysrgb&w=600"
     ]
-    more_features = processor.get_features_batch(more_urls)
-    for url, features in more_features.items():
-        if features is not None:
+    features_arr, ok_mask = processor.get_features_batch(more_urls)
+    for url, features, ok in zip(more_urls, features_arr, ok_mask):
+        if ok:
             print(f"URL: {url}, Feature Vector Shape: {features.shape}")
         else:
             print(f"URL: {url}, Failed to extract features.")
@@ -454,11 +1287,11 @@ if __name__ == "__main__":
         "https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3",
     ]
 
-    extracted_features = clap_processor.get_features_batch(audio_urls)
+    features_arr, ok_mask = clap_processor.get_features_batch(audio_urls)
 
     print("\n--- Extraction Results ---")
-    for url, features in extracted_features.items():
-        if features is not None:
+    for url, features, ok in zip(audio_urls, features_arr, ok_mask):
+        if ok:
 
             print(f"URL: {url}, Feature Vector Shape: {features.shape}")
         else:
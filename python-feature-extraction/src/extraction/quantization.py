@@ -0,0 +1,71 @@
+import logging
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+try:
+    import bitsandbytes as bnb
+
+    BITSANDBYTES_AVAILABLE = True
+except ImportError:
+    BITSANDBYTES_AVAILABLE = False
+
+
+def quantize_linear_layers(
+    module: torch.nn.Module, device: torch.device
+) -> torch.nn.Module:
+    """
+    Quantizes the nn.Linear layers of a model to INT8 for inference.
+
+    On CPU this uses dynamic quantization (INT8 GEMMs through FBGEMM/oneDNN). On CUDA
+    the layers are replaced with bitsandbytes Linear8bitLt modules, which requires
+    bitsandbytes to be installed.
+
+    Args:
+        module: The model to quantize. Must already be on `device`.
+        device: The device the model runs on.
+
+    Returns:
+        The quantized model (a new module on CPU, `module` modified in place on CUDA).
+
+    Raises:
+        RuntimeError: If CUDA quantization is requested but bitsandbytes is not installed.
+    """
+    if device.type == "cpu":
+        return torch.ao.quantization.quantize_dynamic(
+            module, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    if not BITSANDBYTES_AVAILABLE:
+        raise RuntimeError("bitsandbytes is required for INT8 quantization on CUDA.")
+
+    replaced = _replace_linear_with_int8(module)
+    logger.debug(f"Replaced {replaced} Linear layers with Linear8bitLt.")
+    return module
+
+
+def _replace_linear_with_int8(module: torch.nn.Module) -> int:
+    """Recursively swaps nn.Linear children for Linear8bitLt. Returns the swap count."""
+    replaced = 0
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear):
+            int8_linear = bnb.nn.Linear8bitLt(
+                child.in_features,
+                child.out_features,
+                bias=child.bias is not None,
+                has_fp16_weights=False,
+            )
+            int8_linear.weight = bnb.nn.Int8Params(
+                child.weight.data.cpu(), requires_grad=False, has_fp16_weights=False
+            )
+            if child.bias is not None:
+                int8_linear.bias = torch.nn.Parameter(
+                    child.bias.data, requires_grad=False
+                )
+            # Int8Params quantizes the weights when moved to the GPU.
+            setattr(module, name, int8_linear.to(child.weight.device))
+            replaced += 1
+        else:
+            replaced += _replace_linear_with_int8(child)
+    return replaced
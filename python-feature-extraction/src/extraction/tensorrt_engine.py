@@ -0,0 +1,88 @@
+import logging
+import os
+from typing import Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch_tensorrt
+
+    TORCH_TENSORRT_AVAILABLE = True
+except ImportError:
+    TORCH_TENSORRT_AVAILABLE = False
+
+
+def build_engine(
+    module: torch.nn.Module,
+    input_res: Tuple[int, int, int],
+    max_batch_size: int,
+    engine_path: str,
+    device: torch.device,
+) -> torch.nn.Module:
+    """
+    Compiles a vision backbone ahead of time to a TensorRT engine with FP16 kernels
+    and saves it to disk, so later startups can load it instead of the HF model.
+
+    Args:
+        module: The eager model (on `device`) to compile.
+        input_res: The fixed input resolution (C, H, W).
+        max_batch_size: The largest batch the engine has to accept. The engine is
+                        built for batch sizes 1..max_batch_size and tuned for the max.
+        engine_path: Where to save the compiled engine.
+        device: The CUDA device the engine runs on.
+
+    Returns:
+        The compiled TensorRT module.
+
+    Raises:
+        RuntimeError: If torch_tensorrt is not installed or the device is not CUDA.
+    """
+    _check_available(device)
+
+    inputs = [
+        torch_tensorrt.Input(
+            min_shape=(1, *input_res),
+            opt_shape=(max_batch_size, *input_res),
+            max_shape=(max_batch_size, *input_res),
+            dtype=torch.float32,
+        )
+    ]
+    trt_module = torch_tensorrt.compile(
+        module,
+        ir="dynamo",
+        inputs=inputs,
+        enabled_precisions={torch.half},
+        device=device,
+    )
+    example = torch.zeros((max_batch_size, *input_res), device=device)
+    os.makedirs(os.path.dirname(os.path.abspath(engine_path)), exist_ok=True)
+    torch_tensorrt.save(trt_module, engine_path, inputs=[example])
+    logger.info(f"Saved TensorRT engine to {engine_path}.")
+    return trt_module
+
+
+def load_engine(engine_path: str, device: torch.device) -> torch.nn.Module:
+    """
+    Loads a TensorRT engine saved by build_engine().
+
+    Args:
+        engine_path: Path of the saved engine.
+        device: The CUDA device to run the engine on.
+
+    Returns:
+        The TensorRT module.
+
+    Raises:
+        RuntimeError: If torch_tensorrt is not installed or the device is not CUDA.
+    """
+    _check_available(device)
+    return torch_tensorrt.load(engine_path).module().to(device)
+
+
+def _check_available(device: torch.device) -> None:
+    if not TORCH_TENSORRT_AVAILABLE:
+        raise RuntimeError("torch_tensorrt is required to use TensorRT engines.")
+    if device.type != "cuda":
+        raise RuntimeError("TensorRT engines can only run on CUDA devices.")
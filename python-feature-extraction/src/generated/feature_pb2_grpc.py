@@ -39,6 +39,11 @@ class FeatureUrlServiceStub(object):
                 request_serializer=feature__pb2.ProcessUrlsRequest.SerializeToString,
                 response_deserializer=feature__pb2.ProcessUrlsResponse.FromString,
                 _registered_method=True)
+        self.ProcessUrlsStream = channel.unary_stream(
+                '/feature.FeatureUrlService/ProcessUrlsStream',
+                request_serializer=feature__pb2.ProcessUrlsRequest.SerializeToString,
+                response_deserializer=feature__pb2.FeatureResult.FromString,
+                _registered_method=True)
 
 
 class FeatureUrlServiceServicer(object):
@@ -50,6 +55,13 @@ class FeatureUrlServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ProcessUrlsStream(self, request, context):
+        """Same as ProcessUrls, but each result is sent as soon as it is built.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FeatureUrlServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +70,11 @@ def add_FeatureUrlServiceServicer_to_server(servicer, server):
                     request_deserializer=feature__pb2.ProcessUrlsRequest.FromString,
                     response_serializer=feature__pb2.ProcessUrlsResponse.SerializeToString,
             ),
+            'ProcessUrlsStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.ProcessUrlsStream,
+                    request_deserializer=feature__pb2.ProcessUrlsRequest.FromString,
+                    response_serializer=feature__pb2.FeatureResult.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'feature.FeatureUrlService', rpc_method_handlers)
@@ -96,6 +113,33 @@ class FeatureUrlService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def ProcessUrlsStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/feature.FeatureUrlService/ProcessUrlsStream',
+            feature__pb2.ProcessUrlsRequest.SerializeToString,
+            feature__pb2.FeatureResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class FeatureBytesServiceStub(object):
     """Missing associated documentation comment in .proto file."""
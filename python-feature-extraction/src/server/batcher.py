@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List, Optional, Sequence, Set
+
+from extraction.extractor import ExtractionResult
+
+logger = logging.getLogger(__name__)
+
+
+# Merged batches running at once; each holds its downloads and model calls.
+MAX_BATCHES_IN_FLIGHT = 4
+
+
+ExtractFn = Callable[
+    [Sequence[str], Sequence[Optional[str]], Sequence[int], bool],
+    List[ExtractionResult],
+]
+
+
+@dataclass(slots=True)
+class _Chunk:
+    """The extractor input of one RPC, waiting to be merged into a batch."""
+
+    page_urls: Sequence[str]
+    media_urls: Sequence[Optional[str]]
+    media_types: Sequence[int]
+    apply_denoising: bool
+    future: "asyncio.Future[List[ExtractionResult]]"
+
+
+class ExtractionBatcher:
+    """
+    Coalesces the extractor calls of concurrent RPCs into larger batches, so the
+    models see one big batch instead of several small ones.
+
+    The first waiting chunk opens a batch. Chunks with the same denoise flag that
+    arrive within batch_timeout_ms are added until max_batch_size items; the batch
+    then runs on a worker thread while the next one is collected. Up to
+    max_batches_in_flight batches run at once, so a batch waiting on a slow
+    download does not hold up the requests behind it; while all are busy, new
+    chunks queue up and are merged into the next batch.
+    """
+
+    def __init__(
+        self,
+        extract_fn: ExtractFn,
+        max_batch_size: int,
+        batch_timeout_ms: float,
+        max_batches_in_flight: int = MAX_BATCHES_IN_FLIGHT,
+    ):
+        """
+        Args:
+            extract_fn: Called as extract_fn(page_urls, media_urls, media_types,
+                        apply_denoising) on a worker thread; returns one result
+                        per item, in order (Extractor.process_url_columns).
+            max_batch_size: Maximum number of items merged into one call. A
+                            larger chunk still runs, on its own.
+            batch_timeout_ms: How long a batch waits for more chunks.
+            max_batches_in_flight: Batches running on worker threads at once.
+        """
+        self._extract_fn = extract_fn
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout_ms / 1000
+        # Created on first use, on the serving event loop.
+        self._queue: Optional["asyncio.Queue[_Chunk]"] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Chunks taken off the queue that did not fit the batch being collected.
+        self._held: Deque[_Chunk] = deque()
+        self._slots = asyncio.Semaphore(max(max_batches_in_flight, 1))
+        # Running _dispatch tasks; the loop only keeps weak references to them.
+        self._dispatching: Set[asyncio.Task] = set()
+
+    async def extract(
+        self,
+        page_urls: Sequence[str],
+        media_urls: Sequence[Optional[str]],
+        media_types: Sequence[int],
+        apply_denoising: bool,
+    ) -> List[ExtractionResult]:
+        """Queues one RPC's items and returns their results once their batch ran."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(
+            _Chunk(page_urls, media_urls, media_types, apply_denoising, future)
+        )
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # A slot is taken before collecting, so chunks arriving while all
+                # batches are busy go into the next one instead of waiting apart.
+                await self._slots.acquire()
+                try:
+                    batch = await self._collect()
+                except BaseException:
+                    self._slots.release()
+                    raise
+                task = asyncio.create_task(self._dispatch(batch))
+                self._dispatching.add(task)
+                task.add_done_callback(self._dispatch_done)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Unexpected error in extraction batcher: %s", e)
+
+    def _dispatch_done(self, task: asyncio.Task) -> None:
+        self._dispatching.discard(task)
+        self._slots.release()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Unexpected error in extraction batcher: %s", task.exception())
+
+    async def _next_chunk(self, timeout: Optional[float]) -> Optional[_Chunk]:
+        if self._held:
+            return self._held.popleft()
+        if timeout is None:
+            return await self._queue.get()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _collect(self) -> List[_Chunk]:
+        """Waits for a chunk and merges compatible chunks into its batch."""
+        first = await self._next_chunk(None)
+        batch = [first]
+        size = len(first.page_urls)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_timeout
+        skipped: List[_Chunk] = []
+
+        while size < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0 and not self._held:
+                break
+            chunk = await self._next_chunk(max(remaining, 0))
+            if chunk is None:
+                break
+            if (
+                chunk.apply_denoising != first.apply_denoising
+                or size + len(chunk.page_urls) > self.max_batch_size
+            ):
+                skipped.append(chunk)
+                continue
+            batch.append(chunk)
+            size += len(chunk.page_urls)
+
+        # Kept in arrival order, ahead of the queue, for the next batches.
+        self._held.extendleft(reversed(skipped))
+        return batch
+
+    async def _dispatch(self, batch: List[_Chunk]) -> None:
+        """Runs one merged extractor call and hands each chunk its results."""
+        batch = [chunk for chunk in batch if not chunk.future.done()]
+        if not batch:
+            return
+        logger.debug(
+            "Extracting a batch of %d items from %d requests.",
+            sum(len(chunk.page_urls) for chunk in batch),
+            len(batch),
+        )
+        try:
+            results = await asyncio.to_thread(
+                self._extract_fn,
+                [url for chunk in batch for url in chunk.page_urls],
+                [url for chunk in batch for url in chunk.media_urls],
+                [media_type for chunk in batch for media_type in chunk.media_types],
+                batch[0].apply_denoising,
+            )
+        except Exception as e:
+            for chunk in batch:
+                if not chunk.future.done():
+                    chunk.future.set_exception(e)
+            return
+
+        offset = 0
+        for chunk in batch:
+            end = offset + len(chunk.page_urls)
+            if not chunk.future.done():
+                chunk.future.set_result(results[offset:end])
+            offset = end
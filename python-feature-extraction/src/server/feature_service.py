@@ -1,10 +1,30 @@
+import asyncio
+import collections
 import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 import numpy as np
-from typing import List, Dict, Any, Tuple
+from cachetools import TTLCache
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit
 
 from generated import feature_pb2, feature_pb2_grpc
 
 from extraction.extractor import (
+    ExtractionResult,
     Extractor,
     STATUS_SUCCESS,
     STATUS_FAILED_DOWNLOAD,
@@ -14,7 +34,8 @@ from extraction.extractor import (
     MEDIA_TYPE_AUDIO,
     MEDIA_TYPE_UNKNOWN,
 )
-from utils.network import filter_urls_by_headers
+from utils.network import head_check_outcomes
+from .batcher import ExtractionBatcher
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +45,142 @@ TYPE_MAP_TO_PROTO = {
     MEDIA_TYPE_AUDIO: feature_pb2.MediaType.AUDIO,
 }
 TYPE_MAP_FROM_PROTO = {v: k for k, v in TYPE_MAP_TO_PROTO.items()}
+# Proto enum values bound once, instead of attribute chains per result.
+_PROTO_SUCCESS = feature_pb2.Status.SUCCESS
+_PROTO_FAILED_DOWNLOAD = feature_pb2.Status.FAILED_DOWNLOAD
+_PROTO_FAILED_PROCESSING = feature_pb2.Status.FAILED_PROCESSING
+_PROTO_FAILED_UNSUPPORTED_TYPE = feature_pb2.Status.FAILED_UNSUPPORTED_TYPE
+_PROTO_STATUS_UNKNOWN = feature_pb2.Status.STATUS_UNKNOWN
 STATUS_MAP_TO_PROTO = {
-    STATUS_SUCCESS: feature_pb2.Status.SUCCESS,
-    STATUS_FAILED_DOWNLOAD: feature_pb2.Status.FAILED_DOWNLOAD,
-    STATUS_FAILED_PROCESSING: feature_pb2.Status.FAILED_PROCESSING,
-    STATUS_FAILED_UNSUPPORTED_TYPE: feature_pb2.Status.FAILED_UNSUPPORTED_TYPE,
+    STATUS_SUCCESS: _PROTO_SUCCESS,
+    STATUS_FAILED_DOWNLOAD: _PROTO_FAILED_DOWNLOAD,
+    STATUS_FAILED_PROCESSING: _PROTO_FAILED_PROCESSING,
+    STATUS_FAILED_UNSUPPORTED_TYPE: _PROTO_FAILED_UNSUPPORTED_TYPE,
+}
+# Internal statuses are small consecutive ints, so the per-result conversion is a
+# tuple index rather than a dict lookup.
+_STATUS_TO_PROTO = tuple(
+    STATUS_MAP_TO_PROTO.get(status, _PROTO_STATUS_UNKNOWN)
+    for status in range(max(STATUS_MAP_TO_PROTO) + 1)
+)
+
+
+def _status_to_proto(status: int) -> int:
+    """The proto Status of an internal one, STATUS_UNKNOWN if it has none."""
+    if 0 <= status < len(_STATUS_TO_PROTO):
+        return _STATUS_TO_PROTO[status]
+    return _PROTO_STATUS_UNKNOWN
+
+
+# Early failures with a fixed message, shared by every item they apply to.
+_UNSUPPORTED_TYPE_FAILURE = (
+    _PROTO_FAILED_UNSUPPORTED_TYPE,
+    "Unsupported or unknown media type.",
+)
+_FILTER_FAILURES = {
+    MEDIA_TYPE_IMAGE: (
+        _PROTO_FAILED_DOWNLOAD,
+        "Failed image pre-filtering (HEAD check on media_url)",
+    ),
+    MEDIA_TYPE_AUDIO: (
+        _PROTO_FAILED_DOWNLOAD,
+        "Failed audio pre-filtering (HEAD check on media_url)",
+    ),
 }
+# Compared directly in the per-item loops instead of looking up TYPE_MAP_FROM_PROTO.
+_PROTO_IMAGE = feature_pb2.MediaType.IMAGE
+_PROTO_AUDIO = feature_pb2.MediaType.AUDIO
+
+# Responses with at least this many vectors are serialized on the thread pool
+# (tobytes releases the GIL); below it the dispatch costs more than the copies.
+SERIALIZE_PARALLEL_MIN = 256
+SERIALIZE_WORKERS = os.cpu_count() or 4
+
+# HEAD-check outcomes remembered per (media type, URL) across requests.
+HEAD_CACHE_SIZE = 100_000
+HEAD_CACHE_TTL_SECONDS = 60 * 60
+# Hosts tracked for trust_hosts_after (consecutive HEAD passes per media type).
+TRUSTED_HOSTS_SIZE = 10_000
+URL_HOST_CACHE_SIZE = 65_536
+# Items ProcessUrlsStream extracts per chunk; each chunk's results are sent as
+# soon as it and the chunks before it have finished.
+STREAM_CHUNK_SIZE = 32
+# Chunks of one ProcessUrlsStream extracted at once: the next one runs while the
+# results of the current one are sent, without putting the whole request on the
+# executor (and the models) at the same time.
+STREAM_CHUNKS_IN_FLIGHT = 2
+
+
+@dataclass(slots=True)
+class UrlColumns:
+    """
+    The kept items of a ProcessUrls request, one list per field (all aligned, in
+    request order) rather than one record per item.
+    """
+
+    page_urls: List[str] = field(default_factory=list)
+    media_urls: List[str] = field(default_factory=list)
+    item_types: List[int] = field(default_factory=list)
+    # (proto status, message) of items that failed before extraction, else None.
+    early_failures: List[Optional[Tuple[int, str]]] = field(default_factory=list)
+    results: List[Optional[ExtractionResult]] = field(default_factory=list)
+
+
+@lru_cache(maxsize=URL_HOST_CACHE_SIZE)
+def _url_host(url: str) -> str:
+    """
+    Returns the lower-cased network location of a URL. Memoized, since scraped
+    media URLs repeat across requests.
+    """
+    return urlsplit(url).netloc.lower()
+
+
+def _vec_to_bytes(arr: np.ndarray) -> bytes:
+    """
+    Serializes a feature vector as raw float32 bytes. The extractor already returns
+    contiguous float32 rows, which are serialized without an intermediate copy.
+    """
+    if arr.dtype == np.float32 and arr.flags.c_contiguous:
+        return arr.tobytes()
+    return np.ascontiguousarray(arr, dtype=np.float32).tobytes()
+
+
+def _result_vector(res: Optional[ExtractionResult]) -> Optional[np.ndarray]:
+    """Returns the feature vector of a successful result, else None."""
+    if res is None or res.status != STATUS_SUCCESS:
+        return None
+    return res.feature_vector
+
+
+def _try_vec_to_bytes(arr: np.ndarray) -> Union[bytes, Exception]:
+    try:
+        return _vec_to_bytes(arr)
+    except Exception as e:
+        return e
+
+
+def _serialize_vectors(
+    pool: ThreadPoolExecutor, results: List[Optional[ExtractionResult]]
+) -> List[Union[bytes, Exception, None]]:
+    """
+    Serializes the feature vectors of all successful results, on `pool` for large
+    responses.
+
+    Returns:
+        One entry per result: the vector bytes, the exception raised while
+        serializing it, or None if the result has no vector.
+    """
+    positions = [i for i, res in enumerate(results) if _result_vector(res) is not None]
+    vectors = [results[i].feature_vector for i in positions]
+    if len(vectors) >= SERIALIZE_PARALLEL_MIN:
+        encoded = list(pool.map(_try_vec_to_bytes, vectors))
+    else:
+        encoded = [_try_vec_to_bytes(vector) for vector in vectors]
+
+    serialized: List[Union[bytes, Exception, None]] = [None] * len(results)
+    for i, vector_bytes in zip(positions, encoded):
+        serialized[i] = vector_bytes
+    return serialized
 
 
 class FeatureURLExtractionService(feature_pb2_grpc.FeatureUrlServiceServicer):
@@ -41,7 +192,30 @@ class FeatureURLExtractionService(feature_pb2_grpc.FeatureUrlServiceServicer):
         max_image_size_mb: int = 20,
         filter_audio: bool = True,
         max_audio_size_mb: int = 100,
+        trust_hosts_after: Optional[int] = None,
+        validate_on_download: bool = True,
+        max_batch_size: int = 0,
+        batch_timeout_ms: float = 5.0,
     ):
+        """
+        Args:
+            max_batch_size: If > 0, the extractor inputs of concurrent requests are
+                            merged into batches of up to this many items (see
+                            ExtractionBatcher).
+            batch_timeout_ms: How long a merged batch waits for more requests.
+            validate_on_download: If True, filtered media types are not HEAD-checked
+                                  up front, saving one round trip per URL. Their
+                                  downloads are validated either way: the
+                                  extractor checks Content-Type and size on the
+                                  streamed GET and aborts rejected downloads, so
+                                  a missing or wrong Content-Length can't let an
+                                  oversized file through.
+            trust_hosts_after: If set, media URLs on a host whose last this many
+                               HEAD checks (for the same media type) all passed
+                               skip the HEAD check. A failed check revokes the
+                               trust. The downloaded content is still validated
+                               by the extractor.
+        """
         if extractor is None:
             raise ValueError("Extractor instance cannot be None")
         self.extractor = extractor
@@ -53,24 +227,131 @@ class FeatureURLExtractionService(feature_pb2_grpc.FeatureUrlServiceServicer):
         self.max_audio_size_bytes = (
             max_audio_size_mb * 1024 * 1024 if max_audio_size_mb else None
         )
-        logger.info(
-            f"FeatureExtractionService initialized. Image filtering: {self.filter_images}, Audio filtering: {self.filter_audio}"
+        self._serialize_pool = ThreadPoolExecutor(
+            max_workers=SERIALIZE_WORKERS, thread_name_prefix="url-serialize"
+        )
+        self._head_cache: TTLCache = TTLCache(
+            maxsize=HEAD_CACHE_SIZE, ttl=HEAD_CACHE_TTL_SECONDS
+        )
+        self._head_cache_lock = threading.Lock()
+        self.trust_hosts_after = trust_hosts_after
+        self.validate_on_download = validate_on_download
+        # Per-type size limits the extractor validates downloads against.
+        self._download_limits: Dict[int, Optional[int]] = {}
+        if filter_images:
+            self._download_limits[MEDIA_TYPE_IMAGE] = self.max_image_size_bytes
+        if filter_audio:
+            self._download_limits[MEDIA_TYPE_AUDIO] = self.max_audio_size_bytes
+        # Media types HEAD-checked up front: their hosts were resolved by the
+        # check's DNS pre-pass, so the extractor does not resolve them again.
+        self._head_checked_types = frozenset(
+            media_type
+            for media_type, enabled in (
+                (MEDIA_TYPE_IMAGE, filter_images),
+                (MEDIA_TYPE_AUDIO, filter_audio),
+            )
+            if enabled and not validate_on_download
+        )
+        # Consecutive HEAD passes per (media type label, host); guarded by the
+        # HEAD cache lock.
+        self._host_passes: TTLCache = TTLCache(
+            maxsize=TRUSTED_HOSTS_SIZE, ttl=HEAD_CACHE_TTL_SECONDS
+        )
+        self._batcher: Optional[ExtractionBatcher] = (
+            ExtractionBatcher(self._extract_columns, max_batch_size, batch_timeout_ms)
+            if max_batch_size > 0
+            else None
         )
-
-    def ProcessUrls(
-        self, request: feature_pb2.ProcessUrlsRequest, context
-    ) -> feature_pb2.ProcessUrlsResponse:
         logger.info(
-            f"Received ProcessUrls request with {len(request.items)} items. Denoising: {request.apply_denoising}"
+            "FeatureExtractionService initialized. Image filtering: %s, Audio filtering: %s, On download: %s",
+            self.filter_images,
+            self.filter_audio,
+            self.validate_on_download,
         )
 
-        response = feature_pb2.ProcessUrlsResponse()
-
-        items_for_filtering: Dict[str, Dict[str, Any]] = {}
-
-        original_items_map_by_page: Dict[str, feature_pb2.UrlItem] = {}
-
-        early_failures_by_page: Dict[str, Tuple[feature_pb2.Status, str]] = {}
+    def _filter_urls_cached(
+        self, urls: Iterable[str], label: str, max_size_bytes: Optional[int]
+    ) -> Dict[str, bool]:
+        """
+        HEAD-checks the given unique media URLs, reusing outcomes cached by earlier
+        requests, so only URLs not seen within the TTL (and not on a trusted host)
+        hit the network. A check that failed without a definitive answer (timeout,
+        429, 5xx) is neither cached nor counted against the host's trust.
+
+        Returns:
+            Whether each URL passed the check.
+        """
+        passed_by_url: Dict[str, bool] = {}
+        urls_to_check: List[str] = []
+        trust_hosts_after = self.trust_hosts_after
+        with self._head_cache_lock:
+            for url in urls:
+                cached_valid = self._head_cache.get((label, url))
+                if cached_valid is None:
+                    if (
+                        trust_hosts_after
+                        and self._host_passes.get((label, _url_host(url)), 0)
+                        >= trust_hosts_after
+                    ):
+                        passed_by_url[url] = True
+                    else:
+                        urls_to_check.append(url)
+                else:
+                    passed_by_url[url] = cached_valid
+
+        if urls_to_check:
+            logger.info("Filtering %d %s media URLs...", len(urls_to_check), label)
+            checked = head_check_outcomes(
+                urls_to_check, label, max_size_bytes=max_size_bytes
+            )
+            with self._head_cache_lock:
+                for url, passed in zip(urls_to_check, checked):
+                    passed_by_url[url] = passed is True
+                    if passed is None:
+                        continue
+                    self._head_cache[(label, url)] = passed
+                    if trust_hosts_after:
+                        host_key = (label, _url_host(url))
+                        self._host_passes[host_key] = (
+                            self._host_passes.get(host_key, 0) + 1 if passed else 0
+                        )
+        return passed_by_url
+
+    async def _process_request(
+        self, request: feature_pb2.ProcessUrlsRequest
+    ) -> UrlColumns:
+        """Validates, HEAD-filters and extracts the items of a ProcessUrls request."""
+        columns, extractor_positions = await asyncio.to_thread(
+            self._prepare_request, request
+        )
+        if extractor_positions:
+            await self._extract(request, columns, extractor_positions)
+        return columns
+
+    def _prepare_request(
+        self, request: feature_pb2.ProcessUrlsRequest
+    ) -> Tuple[UrlColumns, List[int]]:
+        """
+        Validates and HEAD-filters the items of a ProcessUrls request.
+
+        Returns:
+            The request's columns, and the positions of the items to extract.
+        """
+        columns = UrlColumns()
+        page_urls = columns.page_urls
+        media_urls = columns.media_urls
+        item_types = columns.item_types
+        early_failures = columns.early_failures
+        # Partitioned by media type in the same pass: kept positions, and the unique
+        # media URLs (insertion-ordered dict keys) to HEAD-check.
+        positions_by_type: Dict[int, List[int]] = {
+            MEDIA_TYPE_IMAGE: [],
+            MEDIA_TYPE_AUDIO: [],
+        }
+        urls_by_type: Dict[int, Dict[str, None]] = {
+            MEDIA_TYPE_IMAGE: {},
+            MEDIA_TYPE_AUDIO: {},
+        }
 
         for item in request.items:
             page_url = item.page_url
@@ -78,170 +359,290 @@ class FeatureURLExtractionService(feature_pb2_grpc.FeatureUrlServiceServicer):
 
             if not page_url or not media_url:
                 logger.warning(
-                    f"Received item with missing page_url ('{page_url}') or media_url ('{media_url}')."
+                    "Received item with missing page_url ('%s') or media_url ('%s').",
+                    page_url,
+                    media_url,
                 )
 
                 continue
 
-            original_items_map_by_page[page_url] = item
-
-            item_type_internal = TYPE_MAP_FROM_PROTO.get(item.type)
-
-            if (
-                item_type_internal == MEDIA_TYPE_IMAGE
-                or item_type_internal == MEDIA_TYPE_AUDIO
-            ):
-                items_for_filtering[media_url] = {
-                    "page_url": page_url,
-                    "type": item_type_internal,
-                }
+            proto_type = item.type
+            if proto_type == _PROTO_IMAGE:
+                item_type_internal = MEDIA_TYPE_IMAGE
+            elif proto_type == _PROTO_AUDIO:
+                item_type_internal = MEDIA_TYPE_AUDIO
+            else:
+                item_type_internal = MEDIA_TYPE_UNKNOWN
+            # Read the protobuf field once; interned since it is hashed for the
+            # HEAD-filter dedup and membership checks.
+            media_url = sys.intern(media_url)
+            type_positions = positions_by_type.get(item_type_internal)
+            if type_positions is not None:
+                type_positions.append(len(page_urls))
+                urls_by_type[item_type_internal][media_url] = None
+            page_urls.append(page_url)
+            media_urls.append(media_url)
+            item_types.append(item_type_internal)
+
+            if type_positions is not None:
+                early_failures.append(None)
             else:
                 logger.warning(
-                    f"Received item with unknown/unsupported type ({item.type}) for page: {page_url}, media: {media_url}"
-                )
-                early_failures_by_page[page_url] = (
-                    feature_pb2.Status.FAILED_UNSUPPORTED_TYPE,
-                    f"Unsupported media type: {item.type}",
+                    "Received item with unknown/unsupported type (%s) for page: %s, media: %s",
+                    proto_type,
+                    page_url,
+                    media_url,
                 )
+                early_failures.append(_UNSUPPORTED_TYPE_FAILURE)
+
+        for media_type, enabled, label, max_size_bytes in (
+            (MEDIA_TYPE_IMAGE, self.filter_images, "image", self.max_image_size_bytes),
+            (MEDIA_TYPE_AUDIO, self.filter_audio, "audio", self.max_audio_size_bytes),
+        ):
+            positions = positions_by_type[media_type]
+            if not enabled or not positions or self.validate_on_download:
+                continue
 
-        image_media_urls = [
-            m_url
-            for m_url, data in items_for_filtering.items()
-            if data["type"] == MEDIA_TYPE_IMAGE
-        ]
-        audio_media_urls = [
-            m_url
-            for m_url, data in items_for_filtering.items()
-            if data["type"] == MEDIA_TYPE_AUDIO
-        ]
-
-        valid_image_media_urls = image_media_urls
-        if self.filter_images and image_media_urls:
-            logger.info(f"Filtering {len(image_media_urls)} image media URLs...")
-            valid_image_media_urls = filter_urls_by_headers(
-                image_media_urls, "image", max_size_bytes=self.max_image_size_bytes
+            passed_by_url = self._filter_urls_cached(
+                urls_by_type[media_type], label, max_size_bytes
             )
-            for media_url in image_media_urls:
-                if media_url not in valid_image_media_urls:
-                    page_url = items_for_filtering[media_url]["page_url"]
-                    early_failures_by_page[page_url] = (
-                        feature_pb2.Status.FAILED_DOWNLOAD,
-                        "Failed image pre-filtering (HEAD check on media_url)",
-                    )
+            filter_failure = _FILTER_FAILURES[media_type]
+            for i in positions:
+                if not passed_by_url[media_urls[i]]:
+                    early_failures[i] = filter_failure
 
-        valid_audio_media_urls = audio_media_urls
-        if self.filter_audio and audio_media_urls:
-            logger.info(f"Filtering {len(audio_media_urls)} audio media URLs...")
-            valid_audio_media_urls = filter_urls_by_headers(
-                audio_media_urls, "audio", max_size_bytes=self.max_audio_size_bytes
-            )
-            for media_url in audio_media_urls:
-                if media_url not in valid_audio_media_urls:
-                    page_url = items_for_filtering[media_url]["page_url"]
-                    early_failures_by_page[page_url] = (
-                        feature_pb2.Status.FAILED_DOWNLOAD,
-                        "Failed audio pre-filtering (HEAD check on media_url)",
-                    )
+        extractor_positions = [
+            i for i, failure in enumerate(early_failures) if failure is None
+        ]
+        columns.results = [None] * len(page_urls)
+        return columns, extractor_positions
 
-        items_to_process_extractor: List[Dict[str, Any]] = []
-        for media_url in valid_image_media_urls:
-            details = items_for_filtering[media_url]
-            items_to_process_extractor.append(
-                {
-                    "page_url": details["page_url"],
-                    "media_url": media_url,
-                    "type": MEDIA_TYPE_IMAGE,
-                }
-            )
-        for media_url in valid_audio_media_urls:
-            details = items_for_filtering[media_url]
-            items_to_process_extractor.append(
-                {
-                    "page_url": details["page_url"],
-                    "media_url": media_url,
-                    "type": MEDIA_TYPE_AUDIO,
-                }
-            )
+    def _extract_columns(
+        self,
+        page_urls: Sequence[str],
+        media_urls: Sequence[Optional[str]],
+        media_types: Sequence[int],
+        apply_denoising: bool,
+    ) -> List[ExtractionResult]:
+        # Passed as columns: the items are validated and interned already, so no
+        # per-item dict is built for process_batch.
+        return self.extractor.process_url_columns(
+            page_urls,
+            media_urls,
+            media_types,
+            apply_denoising=apply_denoising,
+            download_limits=self._download_limits,
+            resolved_types=self._head_checked_types,
+        )
 
-        extractor_results_by_page: Dict[str, Dict[str, Any]] = {}
-        if items_to_process_extractor:
-            try:
-                raw_extractor_results = self.extractor.process_batch(
-                    items_to_process_extractor, apply_denoising=request.apply_denoising
+    async def _extract(
+        self,
+        request: feature_pb2.ProcessUrlsRequest,
+        columns: UrlColumns,
+        extractor_positions: List[int],
+    ) -> None:
+        """
+        Extracts the items at extractor_positions into columns.results, through
+        the batcher if enabled. A failed extraction becomes their early failure.
+        """
+        page_urls = [columns.page_urls[i] for i in extractor_positions]
+        media_urls = [columns.media_urls[i] for i in extractor_positions]
+        media_types = [columns.item_types[i] for i in extractor_positions]
+        try:
+            if self._batcher is not None:
+                raw_extractor_results = await self._batcher.extract(
+                    page_urls, media_urls, media_types, request.apply_denoising
+                )
+            else:
+                raw_extractor_results = await asyncio.to_thread(
+                    self._extract_columns,
+                    page_urls,
+                    media_urls,
+                    media_types,
+                    request.apply_denoising,
                 )
 
-                for res in raw_extractor_results:
-                    extractor_results_by_page[res["url"]] = res
+            extractor_results = columns.results
+            for i, res in zip(extractor_positions, raw_extractor_results):
+                extractor_results[i] = res
 
-            except Exception as e:
+        except Exception as e:
+            logger.error(
+                "Critical error during extractor.process_url_columns: %s",
+                e,
+                exc_info=True,
+            )
+
+            batch_failure = (
+                _PROTO_FAILED_PROCESSING,
+                f"Extractor batch processing error: {e}",
+            )
+            early_failures = columns.early_failures
+            for i in extractor_positions:
+                early_failures[i] = batch_failure
+
+    @staticmethod
+    def _result_fields(
+        page_url: str,
+        media_url: str,
+        early_failure: Optional[Tuple[feature_pb2.Status, str]],
+        internal_result: Optional[ExtractionResult],
+        vector_bytes: Union[bytes, Exception, None],
+    ) -> Tuple[str, int, str, bytes]:
+        """Returns the (url, status, error_message, feature_vector) of one result."""
+        feature_vector = b""
+
+        if early_failure is not None:
+
+            status_enum, error_msg = early_failure
+        elif internal_result is not None:
+
+            status_enum = _status_to_proto(internal_result.status)
+            error_msg = internal_result.error_message or ""
+
+            if isinstance(vector_bytes, Exception):
+                e = vector_bytes
                 logger.error(
-                    f"Critical error during extractor.process_batch: {e}", exc_info=True
+                    "Failed to serialize feature vector for page %s (media: %s): %s",
+                    page_url,
+                    media_url,
+                    e,
                 )
+                status_enum = _PROTO_FAILED_PROCESSING
+                error_msg = f"Failed to serialize vector: {e}"
+            elif vector_bytes is not None:
+                feature_vector = vector_bytes
+        else:
+
+            logger.error(
+                "Page URL %s (media: %s) was not found in early failures or extractor results.",
+                page_url,
+                media_url,
+            )
+            status_enum = _PROTO_FAILED_PROCESSING
+            error_msg = "Internal Server Error: Result not found after processing."
 
-                for item in items_to_process_extractor:
-                    page_url = item["page_url"]
-                    if page_url not in early_failures_by_page:
-                        early_failures_by_page[page_url] = (
-                            feature_pb2.Status.FAILED_PROCESSING,
-                            f"Extractor batch processing error: {e}",
-                        )
-
-        logger.info("Constructing gRPC response...")
-        for page_url, original_item in original_items_map_by_page.items():
+        return page_url, status_enum, error_msg, feature_vector
 
-            feature_result = feature_pb2.FeatureResult(url=page_url)
+    async def ProcessUrls(
+        self, request: feature_pb2.ProcessUrlsRequest, context
+    ) -> feature_pb2.ProcessUrlsResponse:
+        logger.info(
+            "Received ProcessUrls request with %d items. Denoising: %s",
+            len(request.items),
+            request.apply_denoising,
+        )
+        # The HEAD checks, downloads, inference and serialization block, so they
+        # run on the loop's executor while the loop keeps serving other RPCs.
+        columns = await self._process_request(request)
+        return await asyncio.to_thread(self._build_response, columns)
 
-            if page_url in early_failures_by_page:
+    def _build_response(self, columns: UrlColumns) -> feature_pb2.ProcessUrlsResponse:
+        response = feature_pb2.ProcessUrlsResponse()
 
-                status_enum, error_msg = early_failures_by_page[page_url]
-                feature_result.status = status_enum
-                feature_result.error_message = error_msg
-            elif page_url in extractor_results_by_page:
+        logger.info("Constructing gRPC response...")
+        serialized_vectors = _serialize_vectors(self._serialize_pool, columns.results)
+        for fields in zip(
+            columns.page_urls,
+            columns.media_urls,
+            columns.early_failures,
+            columns.results,
+            serialized_vectors,
+        ):
+            page_url, status_enum, error_msg, feature_vector = self._result_fields(
+                *fields
+            )
+            # All fields in one call, built in place: appending a finished message
+            # would copy it, vector included, into the repeated field.
+            response.results.add(
+                url=page_url,
+                status=status_enum,
+                error_message=error_msg,
+                feature_vector=feature_vector,
+            )
 
-                internal_result = extractor_results_by_page[page_url]
-                internal_status = internal_result["status"]
+        logger.info(
+            "Sending ProcessUrls response with %d results.", len(response.results)
+        )
+        return response
 
-                feature_result.status = STATUS_MAP_TO_PROTO.get(
-                    internal_status, feature_pb2.Status.STATUS_UNKNOWN
-                )
-                feature_result.error_message = (
-                    internal_result.get("error_message", "") or ""
-                )
+    async def ProcessUrlsStream(
+        self, request: feature_pb2.ProcessUrlsRequest, context
+    ) -> AsyncIterator[feature_pb2.FeatureResult]:
+        """
+        Server-streaming ProcessUrls. Results are sent in request order, the
+        extracted items in chunks of STREAM_CHUNK_SIZE as each chunk finishes, so
+        the first results arrive after one chunk rather than the whole request.
+        """
+        logger.info(
+            "Received ProcessUrlsStream request with %d items. Denoising: %s",
+            len(request.items),
+            request.apply_denoising,
+        )
 
-                if (
-                    internal_status == STATUS_SUCCESS
-                    and internal_result.get("feature_vector") is not None
+        columns, extractor_positions = await asyncio.to_thread(
+            self._prepare_request, request
+        )
+        chunks = [
+            extractor_positions[start : start + STREAM_CHUNK_SIZE]
+            for start in range(0, len(extractor_positions), STREAM_CHUNK_SIZE)
+        ]
+        # Up to STREAM_CHUNKS_IN_FLIGHT chunks, the one sent next included, are
+        # extracted at once.
+        chunk_tasks = collections.deque()
+        started = 0
+        next_index = 0
+        try:
+            for chunk in chunks:
+                while (
+                    started < len(chunks) and len(chunk_tasks) < STREAM_CHUNKS_IN_FLIGHT
                 ):
-                    feature_vector_np: np.ndarray = internal_result["feature_vector"]
-                    try:
-                        feature_result.feature_vector = feature_vector_np.astype(
-                            np.float32
-                        ).tobytes()
-                    except Exception as e:
-                        logger.error(
-                            f"Failed to serialize feature vector for page {page_url} (media: {original_item.media_url}): {e}"
-                        )
-                        feature_result.status = feature_pb2.Status.FAILED_PROCESSING
-                        feature_result.error_message = (
-                            f"Failed to serialize vector: {e}"
+                    chunk_tasks.append(
+                        asyncio.ensure_future(
+                            self._extract(request, columns, chunks[started])
                         )
-                        feature_result.feature_vector = b""
-            else:
-
-                logger.error(
-                    f"Page URL {page_url} (media: {original_item.media_url}) was not found in early failures or extractor results."
-                )
-                feature_result.status = feature_pb2.Status.FAILED_PROCESSING
-                feature_result.error_message = (
-                    "Internal Server Error: Result not found after processing."
-                )
-
-            response.results.append(feature_result)
-
-        logger.info(
-            f"Sending ProcessUrls response with {len(response.results)} results."
+                    )
+                    started += 1
+                # The early failures before the chunk can go out while it runs.
+                while next_index < chunk[0]:
+                    yield self._stream_result(columns, next_index)
+                    next_index += 1
+                await chunk_tasks.popleft()
+                for i in chunk:
+                    # Items between extractor positions failed early.
+                    while next_index < i:
+                        yield self._stream_result(columns, next_index)
+                        next_index += 1
+                    yield self._stream_result(columns, i)
+                    # Sent; the vector is not kept until the stream ends.
+                    columns.results[i] = None
+                    next_index = i + 1
+        finally:
+            for task in chunk_tasks:
+                task.cancel()
+        while next_index < len(columns.page_urls):
+            yield self._stream_result(columns, next_index)
+            next_index += 1
+
+        logger.info("Streamed %d ProcessUrls results.", len(columns.page_urls))
+
+    def _stream_result(self, columns: UrlColumns, i: int) -> feature_pb2.FeatureResult:
+        internal_result = columns.results[i]
+        vector = _result_vector(internal_result)
+        vector_bytes = _try_vec_to_bytes(vector) if vector is not None else None
+        page_url, status_enum, error_msg, feature_vector = self._result_fields(
+            columns.page_urls[i],
+            columns.media_urls[i],
+            columns.early_failures[i],
+            internal_result,
+            vector_bytes,
+        )
+        return feature_pb2.FeatureResult(
+            url=page_url,
+            status=status_enum,
+            error_message=error_msg,
+            feature_vector=feature_vector,
         )
-        return response
 
 
 class FeatureBytesExtractionService(feature_pb2_grpc.FeatureBytesServiceServicer):
@@ -249,16 +650,29 @@ class FeatureBytesExtractionService(feature_pb2_grpc.FeatureBytesServiceServicer
         if extractor is None:
             raise ValueError("Extractor instance cannot be None")
         self.extractor = extractor
+        self._serialize_pool = ThreadPoolExecutor(
+            max_workers=SERIALIZE_WORKERS, thread_name_prefix="bytes-serialize"
+        )
 
-    def ProcessBytes(self, request, context):
+    async def ProcessBytes(self, request, context):
         logger.info(
-            f"Received ProcessBytes request with {len(request.items)} items. Denoising: {request.apply_denoising}"
+            "Received ProcessBytes request with %d items. Denoising: %s",
+            len(request.items),
+            request.apply_denoising,
         )
+        return await asyncio.to_thread(self._process_bytes, request)
 
+    def _process_bytes(self, request):
         # Prepare items for extractor
         items_to_process = []
         for item in request.items:
-            internal_type = TYPE_MAP_FROM_PROTO.get(item.media_type, MEDIA_TYPE_UNKNOWN)
+            proto_type = item.media_type
+            if proto_type == _PROTO_IMAGE:
+                internal_type = MEDIA_TYPE_IMAGE
+            elif proto_type == _PROTO_AUDIO:
+                internal_type = MEDIA_TYPE_AUDIO
+            else:
+                internal_type = MEDIA_TYPE_UNKNOWN
             items_to_process.append({
                 "content": item.media_content,
                 "type": internal_type,
@@ -271,47 +685,49 @@ class FeatureBytesExtractionService(feature_pb2_grpc.FeatureBytesServiceServicer
                 items_to_process, apply_denoising=request.apply_denoising
             )
         except Exception as e:
-            logger.error(f"Critical error during extractor.process_batch_bytes: {e}", exc_info=True)
-            # Return all failed
+            logger.error(
+                "Critical error during extractor.process_batch_bytes: %s",
+                e,
+                exc_info=True,
+            )
+            # Return all failed, with one shared message. add() builds each result
+            # in place; extend() with finished messages would copy every one.
+            error_msg = f"Extractor batch processing error: {e}"
             response = feature_pb2.ProcessBytesResponse()
+            add_result = response.results.add
             for item in request.items:
-                response.results.append(
-                    feature_pb2.FeatureResult(
-                        url=item.reference_id,
-                        status=feature_pb2.Status.FAILED_PROCESSING,
-                        error_message=f"Extractor batch processing error: {e}",
-                        feature_vector=b"",
-                    )
+                add_result(
+                    url=item.reference_id,
+                    status=_PROTO_FAILED_PROCESSING,
+                    error_message=error_msg,
                 )
             return response
 
         # Build response
         response = feature_pb2.ProcessBytesResponse()
-        for res in extractor_results:
-            feature_result = feature_pb2.FeatureResult(
-                url=res["url"],
-                status=STATUS_MAP_TO_PROTO.get(res["status"], feature_pb2.Status.STATUS_UNKNOWN),
-                error_message=res.get("error_message", "") or "",
+        serialized_vectors = _serialize_vectors(self._serialize_pool, extractor_results)
+        for res, vector_bytes in zip(extractor_results, serialized_vectors):
+            status_enum = _status_to_proto(res.status)
+            error_msg = res.error_message or ""
+            feature_vector = b""
+            if isinstance(vector_bytes, Exception):
+                e = vector_bytes
+                logger.error(
+                    "Failed to serialize feature vector for ref_id %s: %s", res.url, e
+                )
+                status_enum = _PROTO_FAILED_PROCESSING
+                error_msg = f"Failed to serialize vector: {e}"
+            elif vector_bytes is not None:
+                feature_vector = vector_bytes
+            response.results.add(
+                url=res.url,
+                status=status_enum,
+                error_message=error_msg,
+                feature_vector=feature_vector,
             )
-            if (
-                res["status"] == STATUS_SUCCESS
-                and res.get("feature_vector") is not None
-            ):
-                try:
-                    feature_result.feature_vector = res["feature_vector"].astype(np.float32).tobytes()
-                except Exception as e:
-                    logger.error(
-                        f"Failed to serialize feature vector for ref_id {res['url']}: {e}"
-                    )
-                    feature_result.status = feature_pb2.Status.FAILED_PROCESSING
-                    feature_result.error_message = f"Failed to serialize vector: {e}"
-                    feature_result.feature_vector = b""
-            else:
-                feature_result.feature_vector = b""
-            response.results.append(feature_result)
 
         logger.info(
-            f"Sending ProcessBytes response with {len(response.results)} results."
+            "Sending ProcessBytes response with %d results.", len(response.results)
         )
         return response
 
@@ -1,7 +1,10 @@
 import grpc
 from concurrent import futures
+import asyncio
 import time
 import logging
+import multiprocessing
+import multiprocessing.connection
 import os
 import sys
 
@@ -15,7 +18,9 @@ if src_dir not in sys.path:
     sys.path.insert(0, src_dir)
 
 
-from extraction.extractor import Extractor
+from extraction.extractor import get_extractor
+from extraction.inference_worker import RemoteExtractor, run_inference_worker
+from utils.network import enable_http_cache
 from .feature_service import FeatureBytesExtractionService, FeatureURLExtractionService
 
 
@@ -32,31 +37,96 @@ _SERVER_ADDRESS_ENV = "FEATURE_SERVER_ADDRESS"
 _DEFAULT_SERVER_ADDRESS = "[::]:50051"
 _MAX_WORKERS_ENV = "FEATURE_MAX_WORKERS"
 _DEFAULT_MAX_WORKERS = 10
+# Optional TensorRT engine path for MambaVision (built on first start if missing).
+_TRT_ENGINE_PATH_ENV = "FEATURE_TRT_ENGINE_PATH"
+# Optional on-disk cache for downloaded media (SQLite file path).
+_HTTP_CACHE_PATH_ENV = "FEATURE_HTTP_CACHE_PATH"
+# Server processes sharing the port through SO_REUSEPORT. Each process loads its
+# own Extractor (one model replica per process), so size this to the GPU memory.
+_PROCESSES_ENV = "FEATURE_SERVER_PROCESSES"
+_DEFAULT_PROCESSES = 1
+# Skip the HEAD pre-filter for hosts whose last N checks all passed (unset: never).
+_TRUST_HOSTS_AFTER_ENV = "FEATURE_TRUST_HOSTS_AFTER"
+# Validate media type and size only on the download, without a HEAD pre-filter.
+# Set to 0 to HEAD-check media URLs before downloading them as well.
+_VALIDATE_ON_DOWNLOAD_ENV = "FEATURE_VALIDATE_ON_DOWNLOAD"
+# Concurrent ProcessUrls requests are merged into extractor batches of up to
+# FEATURE_MAX_BATCH items (0 disables), each waiting FEATURE_BATCH_TIMEOUT_MS.
+_MAX_BATCH_ENV = "FEATURE_MAX_BATCH"
+_DEFAULT_MAX_BATCH = 256
+_BATCH_TIMEOUT_MS_ENV = "FEATURE_BATCH_TIMEOUT_MS"
+_DEFAULT_BATCH_TIMEOUT_MS = 5.0
+# Set to 1 to load the models in one dedicated inference process shared by all
+# server processes, instead of one replica in each server process.
+_INFERENCE_PROCESS_ENV = "FEATURE_INFERENCE_PROCESS"
 
 _ONE_DAY_IN_SECONDS = 60 * 60 * 24
+# Exit code of a server process whose inference process has exited.
+_EXIT_INFERENCE_LOST = 3
 
 
-def serve():
-    """Starts the gRPC server."""
+def _extractor_kwargs() -> dict:
+    return {
+        "device": None,
+        "mamba_config": {"trt_engine_path": os.environ.get(_TRT_ENGINE_PATH_ENV)},
+    }
+
+
+async def serve(inference_conn=None) -> int:
+    """
+    Starts the gRPC server.
+
+    Args:
+        inference_conn: Pipe end to the inference process. If given, extraction
+                        is forwarded to it instead of loading the models here.
+
+    Returns:
+        The exit code for the process: _EXIT_INFERENCE_LOST if the server stopped
+        because the inference process exited, else 0.
+    """
 
     server_address = os.environ.get(_SERVER_ADDRESS_ENV, _DEFAULT_SERVER_ADDRESS)
     max_workers = int(os.environ.get(_MAX_WORKERS_ENV, _DEFAULT_MAX_WORKERS))
+    http_cache_path = os.environ.get(_HTTP_CACHE_PATH_ENV)
+    trust_hosts_after = os.environ.get(_TRUST_HOSTS_AFTER_ENV)
+    validate_on_download = os.environ.get(
+        _VALIDATE_ON_DOWNLOAD_ENV, "1"
+    ).lower() not in ("0", "false", "no")
+    max_batch_size = int(os.environ.get(_MAX_BATCH_ENV, _DEFAULT_MAX_BATCH))
+    batch_timeout_ms = float(
+        os.environ.get(_BATCH_TIMEOUT_MS_ENV, _DEFAULT_BATCH_TIMEOUT_MS)
+    )
+    if http_cache_path:
+        enable_http_cache(http_cache_path)
 
     logger.info("--- Initializing Feature Extraction Service ---")
 
+    loop = asyncio.get_running_loop()
+    inference_lost = asyncio.Event()
+
+    def on_inference_closed():
+        # Called from the RemoteExtractor's reader thread.
+        try:
+            loop.call_soon_threadsafe(inference_lost.set)
+        except RuntimeError:
+            pass  # The loop is closed already: this server has stopped anyway.
+
     try:
-        extractor = Extractor(device=None)
+        if inference_conn is not None:
+            extractor = RemoteExtractor(inference_conn, on_closed=on_inference_closed)
+        else:
+            extractor = get_extractor(**_extractor_kwargs())
     except RuntimeError as e:
         logger.critical(
             f"Failed to initialize Extractor: {e}. Server cannot start.", exc_info=True
         )
-        return
+        return 0
     except Exception as e:
         logger.critical(
             f"An unexpected error occurred during Extractor initialization: {e}. Server cannot start.",
             exc_info=True,
         )
-        return
+        return 0
 
     url_feature_service = FeatureURLExtractionService(
         extractor=extractor,
@@ -64,13 +134,22 @@ def serve():
         max_image_size_mb=25,
         filter_audio=True,
         max_audio_size_mb=150,
+        trust_hosts_after=int(trust_hosts_after) if trust_hosts_after else None,
+        validate_on_download=validate_on_download,
+        max_batch_size=max_batch_size,
+        batch_timeout_ms=batch_timeout_ms,
     )
 
     bytes_feature_service = FeatureBytesExtractionService(
         extractor=extractor,
     )
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    # The handlers are coroutines that hand their blocking work to the loop's
+    # default executor, so that pool, not the server, bounds concurrent batches.
+    loop.set_default_executor(futures.ThreadPoolExecutor(max_workers=max_workers))
+    # Lets every server process bind the same port; the kernel then spreads the
+    # incoming connections across them.
+    server = grpc.aio.server(options=[("grpc.so_reuseport", 1)])
     feature_pb2_grpc.add_FeatureUrlServiceServicer_to_server(
         url_feature_service, server
     )
@@ -78,14 +157,24 @@ def serve():
         bytes_feature_service, server
     )
 
+    exit_code = 0
     try:
         server.add_insecure_port(server_address)
-        server.start()
+        await server.start()
         logger.info(f"🚀 Feature Extraction Server started successfully!")
         logger.info(f"Listening on: {server_address}")
         logger.info(f"Max workers: {max_workers}")
 
-        server.wait_for_termination()
+        termination = asyncio.ensure_future(server.wait_for_termination())
+        lost = asyncio.ensure_future(inference_lost.wait())
+        await asyncio.wait({termination, lost}, return_when=asyncio.FIRST_COMPLETED)
+        termination.cancel()
+        lost.cancel()
+        if inference_lost.is_set():
+            logger.critical(
+                "The inference process exited; stopping this server so it can be restarted."
+            )
+            exit_code = _EXIT_INFERENCE_LOST
 
     except OSError as e:
         logger.critical(
@@ -100,13 +189,101 @@ def serve():
     finally:
         logger.info("Attempting to stop the server...")
 
-        server.stop(10)
+        await server.stop(10)
         logger.info("Server shut down.")
+    return exit_code
 
 
-if __name__ == "__main__":
+def _serve_process(inference_conn=None):
+    """Entry point of one server process."""
+    try:
+        exit_code = asyncio.run(serve(inference_conn))
+    except KeyboardInterrupt:
+        logger.info("Server shutdown requested via KeyboardInterrupt.")
+        return
+    if exit_code:
+        sys.exit(exit_code)
+
+
+def _inference_process(conns):
+    """Entry point of the inference process."""
+    try:
+        run_inference_worker(conns, _extractor_kwargs())
+    except KeyboardInterrupt:
+        logger.info("Inference process shutdown requested via KeyboardInterrupt.")
+
+
+def main():
+    """
+    Runs the server in this process, or in FEATURE_SERVER_PROCESSES processes so
+    request handling (protobuf, partitioning, response building) isn't limited to
+    one core by the GIL. With FEATURE_INFERENCE_PROCESS set, the server processes
+    share the models of one inference process.
+    """
+    processes = max(int(os.environ.get(_PROCESSES_ENV, _DEFAULT_PROCESSES)), 1)
+    inference_process_env = os.environ.get(_INFERENCE_PROCESS_ENV, "0").lower()
+    use_inference_process = inference_process_env in ("1", "true", "yes")
+    if processes == 1 and not use_inference_process:
+        _serve_process()
+        return
+
+    # Spawned rather than forked, so no process inherits CUDA state.
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    server_conns = [None] * processes
+    if use_inference_process:
+        # One pipe per server process; the inference process serves them all and
+        # exits once every server process has exited.
+        pipes = [context.Pipe() for _ in range(processes)]
+        server_conns = [server_end for server_end, _ in pipes]
+        worker_conns = [worker_end for _, worker_end in pipes]
+        workers.append(
+            context.Process(
+                target=_inference_process,
+                args=(worker_conns,),
+                name="feature-inference",
+            )
+        )
+    workers.extend(
+        context.Process(target=_serve_process, args=(conn,), name=f"feature-server-{i}")
+        for i, conn in enumerate(server_conns)
+    )
+    logger.info(
+        f"Starting {processes} server processes"
+        f"{' and the inference process' if use_inference_process else ''}..."
+    )
+    for worker in workers:
+        worker.start()
+    if use_inference_process:
+        # Only the children's copies may stay open, or the inference process would
+        # never see the server processes close their ends.
+        for conn in server_conns + worker_conns:
+            conn.close()
+    failed = False
     try:
-        serve()
+        # A process that fails (e.g. a server whose inference process died) takes
+        # the others down with it, and main exits non-zero, so the supervisor
+        # restarts the whole set.
+        running = {worker.sentinel: worker for worker in workers}
+        while running:
+            for sentinel in multiprocessing.connection.wait(list(running)):
+                worker = running.pop(sentinel)
+                worker.join()
+                if worker.exitcode and not failed:
+                    logger.critical(
+                        f"{worker.name} exited with code {worker.exitcode}, stopping the other processes."
+                    )
+                    failed = True
+                    for other in running.values():
+                        other.terminate()
     except KeyboardInterrupt:
         logger.info("Server shutdown requested via KeyboardInterrupt.")
+        for worker in workers:
+            worker.join()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
 
@@ -1,6 +1,19 @@
 import requests
-from typing import List, Optional
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Mapping, Optional
+from urllib.parse import urlsplit
 import logging
+import socket
+import threading
+
+try:
+    import requests_cache
+
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
 
 
 logging.basicConfig(
@@ -13,88 +26,395 @@ REQUESTS_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
+# Connections kept alive per host. Matches the largest download thread pool, so
+# concurrent requests to the same host reuse connections instead of reconnecting.
+POOL_MAXSIZE = 32
+# Hosts whose connection pools are kept. Media of a batch is often spread over
+# many CDNs, and a host evicted from the pool manager reconnects (TCP + TLS).
+POOL_CONNECTIONS = 64
+# Chunk size of streamed (validated) downloads.
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+# Seconds the DNS pre-pass waits for lookups. Hosts still resolving by then are
+# not rejected; their requests just run into the usual timeouts.
+DNS_TIMEOUT = 1.0
+# Hosts that failed to resolve are remembered this long, so a dead CDN host is
+# neither looked up nor logged again on every request.
+UNRESOLVED_HOST_CACHE_SIZE = 10_000
+UNRESOLVED_HOST_TTL_SECONDS = 5 * 60
+# getaddrinfo errors meaning the name does not exist (or has no address). Others,
+# like EAI_AGAIN, may be a resolver hiccup and don't reject the host.
+_DEFINITE_DNS_ERRORS = frozenset(
+    code
+    for code in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", None))
+    if code is not None
+)
+
+
+def _create_session(session: Optional[requests.Session] = None) -> requests.Session:
+    """Sets up the shared keep-alive session used for all media requests."""
+    session = session if session is not None else requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(REQUESTS_HEADERS)
+    return session
+
+
+_session = _create_session()
+# Runs the DNS pre-pass lookups. Kept alive across calls, so a slow lookup past
+# DNS_TIMEOUT keeps running in the background instead of blocking its caller.
+_resolver_pool = ThreadPoolExecutor(
+    max_workers=POOL_CONNECTIONS, thread_name_prefix="dns-resolver"
+)
+_unresolved_hosts: TTLCache = TTLCache(
+    maxsize=UNRESOLVED_HOST_CACHE_SIZE, ttl=UNRESOLVED_HOST_TTL_SECONDS
+)
+_unresolved_hosts_lock = threading.Lock()
+
+
+def enable_http_cache(cache_path: str, expire_after: int = 24 * 60 * 60) -> bool:
+    """
+    Switches the shared session to one that caches GET and HEAD responses in an
+    SQLite database, so repeated runs over the same URLs read from disk instead of
+    the network.
+
+    Args:
+        cache_path: Path of the SQLite cache file.
+        expire_after: Seconds after which cached responses are refetched.
+
+    Returns:
+        True if the cache is in use, False if requests-cache is not installed.
+    """
+    global _session
+    if not REQUESTS_CACHE_AVAILABLE:
+        logger.warning("requests-cache not installed, HTTP responses won't be cached.")
+        return False
+    _session = _create_session(
+        requests_cache.CachedSession(
+            cache_path,
+            backend="sqlite",
+            expire_after=expire_after,
+            allowable_methods=("GET", "HEAD"),
+        )
+    )
+    logger.info(f"Caching HTTP responses in {cache_path}.")
+    return True
+
+
+def download_media(
+    url: str,
+    timeout: int = 10,
+    expected_content_prefix: Optional[str] = None,
+    max_size_bytes: Optional[int] = None,
+) -> Optional[bytes]:
+    """
+    Downloads the content behind a media URL.
+
+    Args:
+        url: URL to download.
+        timeout: Timeout in seconds for the GET request.
+        expected_content_prefix: If set (e.g. 'image/'), the download is aborted
+                                 unless the response's Content-Type starts with it.
+        max_size_bytes: If set, the download is aborted as soon as the declared or
+                        received size exceeds it.
+
+    Returns:
+        The response body, or None if the download failed or was rejected.
+    """
+    try:
+        if expected_content_prefix is None and max_size_bytes is None:
+            response = _session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return response.content
+
+        # Streamed, so a rejected response is dropped after its headers (or once
+        # it grows too large) rather than downloaded in full.
+        with _session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            headers = response.headers
+            # Without a Content-Length the size is only enforced while reading.
+            declared_size_limit = (
+                max_size_bytes if "Content-Length" in headers else None
+            )
+            if not _headers_acceptable(
+                url, headers, expected_content_prefix, declared_size_limit
+            ):
+                return None
+            chunks = []
+            received = 0
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                received += len(chunk)
+                if max_size_bytes is not None and received > max_size_bytes:
+                    logger.warning(
+                        f"Aborting download (Exceeds max size {max_size_bytes} bytes): {url}"
+                    )
+                    return None
+                chunks.append(chunk)
+            return b"".join(chunks)
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Failed to download {url}: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error while downloading {url}: {e}")
+    return None
+
+
+def download_media_batch(
+    urls: List[str], timeout: int = 10, max_workers: int = 16
+) -> List[Optional[bytes]]:
+    """
+    Downloads several media URLs concurrently.
+
+    Args:
+        urls: URLs to download.
+        timeout: Timeout in seconds for each GET request.
+        max_workers: Maximum number of concurrent downloads.
+
+    Returns:
+        The response bodies in the order of `urls`, None for failed downloads.
+    """
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        return list(pool.map(lambda url: download_media(url, timeout=timeout), urls))
+
+
+def check_hosts_resolve(urls: List[str], timeout: float = DNS_TIMEOUT) -> List[bool]:
+    """
+    Resolves the unique hosts of a list of URLs concurrently, so URLs whose host
+    does not exist can be rejected up front instead of each failing on its own
+    connect.
+
+    Args:
+        urls: URLs whose hosts to resolve.
+        timeout: Seconds to wait for all lookups.
+
+    Returns:
+        Whether each URL may be requested, aligned with `urls`: False only if its
+        host is missing or definitely failed to resolve (a lookup that is still
+        running after `timeout`, or failed with an error other than "no such
+        name", counts as resolving). Hosts that definitely failed within
+        UNRESOLVED_HOST_TTL_SECONDS are not looked up again.
+    """
+    hosts: Dict[str, Optional[int]] = {}
+    url_hosts: List[Optional[str]] = []
+    for url in urls:
+        try:
+            split = urlsplit(url)
+            host, port = split.hostname, split.port
+        except ValueError:
+            host = port = None
+        url_hosts.append(host)
+        if host is not None:
+            hosts.setdefault(host, port)
+    if not hosts:
+        return [False] * len(urls)
+
+    with _unresolved_hosts_lock:
+        bad_hosts = {host for host in hosts if host in _unresolved_hosts}
+    lookups = {
+        host: _resolver_pool.submit(socket.getaddrinfo, host, port)
+        for host, port in hosts.items()
+        if host not in bad_hosts
+    }
+    if lookups:
+        wait(lookups.values(), timeout=timeout)
+    failed_hosts = set()
+    for host, lookup in lookups.items():
+        if not lookup.done():
+            continue
+        error = lookup.exception()
+        if error is None:
+            continue
+        if isinstance(error, socket.gaierror) and error.errno in _DEFINITE_DNS_ERRORS:
+            logger.warning(f"Host does not resolve ({error}): {host}")
+            failed_hosts.add(host)
+        else:
+            logger.debug(f"DNS lookup for {host} failed, not rejecting it: {error}")
+    if failed_hosts:
+        with _unresolved_hosts_lock:
+            for host in failed_hosts:
+                _unresolved_hosts[host] = None
+        bad_hosts |= failed_hosts
+
+    return [host is not None and host not in bad_hosts for host in url_hosts]
+
 
 def filter_urls_by_headers(
     urls: List[str],
     media_type: str,
     max_size_bytes: Optional[int] = None,
     timeout: int = 5,
+    max_workers: int = POOL_MAXSIZE,
 ) -> List[str]:
     """
-    Filters a list of URLs based on HTTP HEAD request headers.
+    Filters a list of URLs based on HTTP HEAD request headers. See check_urls_by_headers.
+
+    Returns:
+        A list of URLs that passed the checks, in the order of `urls`.
+    """
+    passed = check_urls_by_headers(
+        urls, media_type, max_size_bytes, timeout=timeout, max_workers=max_workers
+    )
+    return [url for url, ok in zip(urls, passed) if ok]
+
+
+def check_urls_by_headers(
+    urls: List[str],
+    media_type: str,
+    max_size_bytes: Optional[int] = None,
+    timeout: int = 5,
+    max_workers: int = POOL_MAXSIZE,
+) -> List[bool]:
+    """
+    Checks a list of URLs based on HTTP HEAD request headers. The HEAD requests
+    are sent concurrently, so a batch takes about as long as its slowest URL.
 
     Args:
-        urls: List of URLs to filter.
+        urls: List of URLs to check.
         media_type: Expected media type ('image' or 'audio').
         max_size_bytes: Maximum allowed content size in bytes. If None, size is not checked.
         timeout: Timeout in seconds for the HEAD request.
+        max_workers: Maximum number of concurrent HEAD requests. Defaults to the
+                     session's per-host connection pool size.
+
+    Returns:
+        Whether each URL passed the checks, aligned with `urls`.
+    """
+    outcomes = head_check_outcomes(
+        urls, media_type, max_size_bytes, timeout=timeout, max_workers=max_workers
+    )
+    return [outcome is True for outcome in outcomes]
+
+
+def head_check_outcomes(
+    urls: List[str],
+    media_type: str,
+    max_size_bytes: Optional[int] = None,
+    timeout: int = 5,
+    max_workers: int = POOL_MAXSIZE,
+) -> List[Optional[bool]]:
+    """
+    check_urls_by_headers, telling definitive rejections from failed checks.
 
     Returns:
-        A list of URLs that passed the checks.
+        Per URL, aligned with `urls`: True if it passed, False if it was rejected
+        for good (no such host, wrong Content-Type, too large, a 4xx other than
+        429), None if it could not be checked (timeout, connection error, 429,
+        5xx) and may pass later.
     """
-    valid_urls = []
     if not media_type in ["image", "audio"]:
         logger.error(
             f"Invalid media_type specified: {media_type}. Must be 'image' or 'audio'."
         )
+        return [False] * len(urls)
+    if not urls:
         return []
 
     expected_content_prefix = f"{media_type}/"
 
-    for url in urls:
-        try:
-            response = requests.head(
-                url, headers=REQUESTS_HEADERS, timeout=timeout, allow_redirects=True
-            )
+    def check(url: str, resolves: bool) -> Optional[bool]:
+        if not resolves:
+            logger.warning(f"Skipping URL (Host does not resolve): {url}")
+            return False
+        return _check_url_headers(url, expected_content_prefix, max_size_bytes, timeout)
 
-            if not response.ok:
-                logger.warning(f"Skipping URL (Status {response.status_code}): {url}")
-                continue
+    # Fails dead hosts after a DNS lookup rather than a HEAD that times out.
+    resolvable = check_hosts_resolve(urls)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as pool:
+        outcomes = list(pool.map(check, urls, resolvable))
 
-            headers = response.headers
+    passed_count = sum(outcome is True for outcome in outcomes)
+    logger.info(f"Filtered URLs: {passed_count} out of {len(urls)} passed checks.")
+    return outcomes
 
-            content_type = headers.get("Content-Type")
-            if not content_type:
-                logger.warning(f"Skipping URL (Missing Content-Type): {url}")
-                continue
-            if not content_type.lower().startswith(expected_content_prefix):
-                logger.warning(
-                    f"Skipping URL (Wrong Content-Type: {content_type}): {url}"
-                )
-                continue
 
-            if max_size_bytes is not None:
-                content_length_str = headers.get("Content-Length")
-                if not content_length_str:
+def _check_url_headers(
+    url: str,
+    expected_content_prefix: str,
+    max_size_bytes: Optional[int],
+    timeout: int,
+) -> Optional[bool]:
+    """
+    HEAD-checks one URL for head_check_outcomes. Returns whether it passed, or
+    None if the check failed in a way that may not last.
+    """
+    try:
+        response = _session.head(url, timeout=timeout, allow_redirects=True)
+
+        if not response.ok:
+            logger.warning(f"Skipping URL (Status {response.status_code}): {url}")
+            status = response.status_code
+            if status == 429 or status >= 500:
+                return None
+            return False
+
+        return _headers_acceptable(
+            url, response.headers, expected_content_prefix, max_size_bytes
+        )
 
+    except requests.exceptions.Timeout:
+        logger.warning(f"Skipping URL (HEAD request timed out): {url}")
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"Skipping URL (HEAD request failed: {e}): {url}")
+    except Exception as e:
+        logger.error(f"Unexpected error during HEAD request for {url}: {e}")
+    return None
+
+
+def _content_type_matches(content_type: str, expected_content_prefix: str) -> bool:
+    """
+    Case-insensitively checks a Content-Type header ('image/png; charset=...')
+    against a lowercase 'type/' or 'type/subtype' prefix. Only the short type and
+    subtype are lowercased, not the whole header with its parameters.
+    """
+    expected_type, _, expected_subtype = expected_content_prefix.partition("/")
+    top_level_type, slash, rest = content_type.partition("/")
+    if not slash or top_level_type.strip().lower() != expected_type:
+        return False
+    if not expected_subtype:
+        return True
+    subtype = rest.partition(";")[0].strip().lower()
+    return subtype.startswith(expected_subtype)
+
+
+def _headers_acceptable(
+    url: str,
+    headers: Mapping[str, str],
+    expected_content_prefix: Optional[str],
+    max_size_bytes: Optional[int],
+) -> bool:
+    """Checks the Content-Type and Content-Length of a media response."""
+    if expected_content_prefix is not None:
+        content_type = headers.get("Content-Type")
+        if not content_type:
+            logger.warning(f"Skipping URL (Missing Content-Type): {url}")
+            return False
+        if not _content_type_matches(content_type, expected_content_prefix):
+            logger.warning(f"Skipping URL (Wrong Content-Type: {content_type}): {url}")
+            return False
+
+    if max_size_bytes is not None:
+        content_length_str = headers.get("Content-Length")
+        if not content_length_str:
+
+            logger.warning(
+                f"Allowing URL (Missing Content-Length, size is checked on download): {url}"
+            )
+        else:
+            try:
+                content_length = int(content_length_str)
+                if content_length > max_size_bytes:
                     logger.warning(
-                        f"Allowing URL (Missing Content-Length, size check skipped): {url}"
+                        f"Skipping URL (Exceeds max size {max_size_bytes} bytes: {content_length} bytes): {url}"
                     )
-                else:
-                    try:
-                        content_length = int(content_length_str)
-                        if content_length > max_size_bytes:
-                            logger.warning(
-                                f"Skipping URL (Exceeds max size {max_size_bytes} bytes: {content_length} bytes): {url}"
-                            )
-                            continue
-                    except ValueError:
-                        logger.warning(
-                            f"Skipping URL (Invalid Content-Length: {content_length_str}): {url}"
-                        )
-                        continue
-
-            valid_urls.append(url)
-
-        except requests.exceptions.Timeout:
-            logger.warning(f"Skipping URL (HEAD request timed out): {url}")
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Skipping URL (HEAD request failed: {e}): {url}")
-        except Exception as e:
-            logger.error(f"Unexpected error during HEAD request for {url}: {e}")
-
-    logger.info(f"Filtered URLs: {len(valid_urls)} out of {len(urls)} passed checks.")
-    return valid_urls
+                    return False
+            except ValueError:
+                logger.warning(
+                    f"Skipping URL (Invalid Content-Length: {content_length_str}): {url}"
+                )
+                return False
+
+    return True
 
 
 if __name__ == "__main__":
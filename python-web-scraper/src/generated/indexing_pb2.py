@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0eindexing.proto\x12\x08indexing\"[\n\x0bScrapedItem\x12\x10\n\x08page_url\x18\x01 \x01(\t\x12\x11\n\tmedia_url\x18\x02 \x01(\t\x12\'\n\nmedia_type\x18\x03 \x01(\x0e\x32\x13.indexing.MediaType\"R\n\x1aProcessScrapedItemsRequest\x12$\n\x05items\x18\x01 \x03(\x0b\x32\x15.indexing.ScrapedItem\x12\x0e\n\x06job_id\x18\x02 \x01(\t\"u\n\x1bProcessScrapedItemsResponse\x12\x16\n\x0eitems_received\x18\x01 \x01(\x05\x12\x17\n\x0fitems_processed\x18\x02 \x01(\x05\x12\x14\n\x0citems_failed\x18\x03 \x01(\x05\x12\x0f\n\x07message\x18\x04 \x01(\t*.\n\tMediaType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\t\n\x05IMAGE\x10\x01\x12\t\n\x05\x41UDIO\x10\x02\x32u\n\x0fIndexingService\x12\x62\n\x13ProcessScrapedItems\x12$.indexing.ProcessScrapedItemsRequest\x1a%.indexing.ProcessScrapedItemsResponseB-Z+YOUR_MODULE_PATH/internal/client/indexingpbb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0eindexing.proto\x12\x08indexing\"[\n\x0bScrapedItem\x12\x10\n\x08page_url\x18\x01 \x01(\t\x12\x11\n\tmedia_url\x18\x02 \x01(\t\x12\'\n\nmedia_type\x18\x03 \x01(\x0e\x32\x13.indexing.MediaType\"R\n\x1aProcessScrapedItemsRequest\x12$\n\x05items\x18\x01 \x03(\x0b\x32\x15.indexing.ScrapedItem\x12\x0e\n\x06job_id\x18\x02 \x01(\t\"u\n\x1bProcessScrapedItemsResponse\x12\x16\n\x0eitems_received\x18\x01 \x01(\x05\x12\x17\n\x0fitems_processed\x18\x02 \x01(\x05\x12\x14\n\x0citems_failed\x18\x03 \x01(\x05\x12\x0f\n\x07message\x18\x04 \x01(\t*.\n\tMediaType\x12\x0b\n\x07UNKNOWN\x10\x00\x12\t\n\x05IMAGE\x10\x01\x12\t\n\x05\x41UDIO\x10\x02\x32\xe1\x01\n\x0fIndexingService\x12\x62\n\x13ProcessScrapedItems\x12$.indexing.ProcessScrapedItemsRequest\x1a%.indexing.ProcessScrapedItemsResponse\x12j\n\x19ProcessScrapedItemsStream\x12$.indexing.ProcessScrapedItemsRequest\x1a%.indexing.ProcessScrapedItemsResponse(\x01\x42-Z+YOUR_MODULE_PATH/internal/client/indexingpbb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -40,6 +40,6 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_PROCESSSCRAPEDITEMSREQUEST']._serialized_end=203
   _globals['_PROCESSSCRAPEDITEMSRESPONSE']._serialized_start=205
   _globals['_PROCESSSCRAPEDITEMSRESPONSE']._serialized_end=322
-  _globals['_INDEXINGSERVICE']._serialized_start=372
-  _globals['_INDEXINGSERVICE']._serialized_end=489
+  _globals['_INDEXINGSERVICE']._serialized_start=373
+  _globals['_INDEXINGSERVICE']._serialized_end=598
 # @@protoc_insertion_point(module_scope)
@@ -1,4 +1,5 @@
 import logging
+import re
 import uuid
 
 
@@ -7,10 +8,9 @@ from src.generated import scrape_pb2_grpc
 
 
 from src.utils.utils import (
-    validate_url,
+    parse_http_url,
     validate_depth,
     validate_crawl_strategy,
-    extract_domain,
 )
 
 
@@ -22,10 +22,12 @@ logging.basicConfig(
 )
 
 
-ALLOWED_CRAWL_STRATEGIES = ["default", "pagination_only", "none"]
+ALLOWED_CRAWL_STRATEGIES = frozenset(["default", "pagination_only", "none"])
 DEFAULT_CRAWL_STRATEGY = "default"
 DEFAULT_DEPTH_LIMIT = 2
 DEFAULT_USE_PLAYWRIGHT = True
+# Splits the comma-separated allowed_domains, stripping the spaces around commas.
+_DOMAIN_LIST_SPLIT = re.compile(r"\s*,\s*")
 
 
 class ScraperService(scrape_pb2_grpc.ScraperServiceServicer):
@@ -48,7 +50,9 @@ class ScraperService(scrape_pb2_grpc.ScraperServiceServicer):
         logger.info(f"Received StartScrape request for URL: {request.start_url}")
 
         start_url = request.start_url
-        if not validate_url(start_url):
+        # Parsed once; the default allowed domain below reuses its netloc.
+        parsed_start_url = parse_http_url(start_url)
+        if parsed_start_url is None:
             logger.warning(
                 f"Rejected StartScrape request: Invalid start_url: {start_url}"
             )
@@ -61,9 +65,12 @@ class ScraperService(scrape_pb2_grpc.ScraperServiceServicer):
         allowed_domains_str = request.allowed_domains
         allowed_domains_list = []
         if allowed_domains_str:
-            allowed_domains_list = [d.strip() for d in allowed_domains_str.split(",")]
+            # Empty entries ("a.com,,b.com", a trailing comma) are dropped.
+            allowed_domains_list = [
+                d for d in _DOMAIN_LIST_SPLIT.split(allowed_domains_str.strip()) if d
+            ]
 
-        final_allowed_domains = allowed_domains_list or [extract_domain(start_url)]
+        final_allowed_domains = allowed_domains_list or [parsed_start_url.netloc]
         if not final_allowed_domains or not final_allowed_domains[0]:
             logger.warning(
                 f"Rejected StartScrape request: Could not determine allowed_domains for {start_url}"
@@ -3,6 +3,7 @@ import logging
 import sys
 import os
 import shutil
+from typing import Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,32 @@ SCRAPY_PROJECT_DIR_CONFIG = os.path.join(SRC_DIR, "web_scraper")
 
 SETTINGS_MODULE_PATH = "web_scraper.web_scraper.settings"
 
+# Bytes of Scrapy output read and decoded at once by read_stream.
+READ_CHUNK_SIZE = 65536
+# Output buffered per pipe before the subprocess is paused, so a busy event loop
+# does not stall a chatty crawl on write().
+PIPE_BUFFER_LIMIT = 1024 * 1024
+
+
+def _scrapy_env_overrides() -> dict:
+    """The variables set for every Scrapy subprocess on top of this environment."""
+    paths_to_add = [SRC_DIR]
+    existing_pythonpath = os.environ.get("PYTHONPATH")
+    new_pythonpath = os.pathsep.join(paths_to_add)
+    if existing_pythonpath:
+        pythonpath = f"{new_pythonpath}{os.pathsep}{existing_pythonpath}"
+    else:
+        pythonpath = new_pythonpath
+    return {"PYTHONPATH": pythonpath, "SCRAPY_SETTINGS_MODULE": SETTINGS_MODULE_PATH}
+
+
+# Built once at import rather than for every launched job.
+_SCRAPY_ENV_OVERRIDES = _scrapy_env_overrides()
+
+# The event loop keeps only weak references to tasks, so the output readers of
+# running crawls are kept here until they finish.
+_reader_tasks = set()
+
 
 async def launch_scrapy_crawl_async(
     job_id: str,
@@ -27,10 +54,13 @@ async def launch_scrapy_crawl_async(
     depth_limit: int,
     use_playwright: bool,
     crawl_strategy: str,
-) -> asyncio.subprocess.Process:
+) -> Tuple[asyncio.subprocess.Process, asyncio.Task, asyncio.Task]:
     """
     Launches a Scrapy crawl process as a non-blocking subprocess,
     setting PYTHONPATH and SCRAPY_SETTINGS_MODULE.
+
+    Returns the process and the tasks logging its stdout and stderr, which end
+    once the process closes them.
     """
 
     if not os.path.isfile(os.path.join(SCRAPY_PROJECT_DIR_CONFIG, "scrapy.cfg")):
@@ -61,17 +91,7 @@ async def launch_scrapy_crawl_async(
 
     cwd = SCRAPY_PROJECT_DIR_CONFIG
 
-    process_env = os.environ.copy()
-
-    paths_to_add = [SRC_DIR]
-    existing_pythonpath = process_env.get("PYTHONPATH")
-    new_pythonpath = os.pathsep.join(paths_to_add)
-    if existing_pythonpath:
-        process_env["PYTHONPATH"] = f"{new_pythonpath}{os.pathsep}{existing_pythonpath}"
-    else:
-        process_env["PYTHONPATH"] = new_pythonpath
-
-    process_env["SCRAPY_SETTINGS_MODULE"] = SETTINGS_MODULE_PATH
+    process_env = {**os.environ, **_SCRAPY_ENV_OVERRIDES}
 
     logger.info(f"Job ID [{job_id}]: Launching Scrapy crawl...")
     logger.info(f"Job ID [{job_id}]: Command: {' '.join(command_args)}")
@@ -90,6 +110,7 @@ async def launch_scrapy_crawl_async(
             stderr=asyncio.subprocess.PIPE,
             cwd=cwd,
             env=process_env,
+            limit=PIPE_BUFFER_LIMIT,
         )
 
         logger.info(
@@ -98,8 +119,11 @@ async def launch_scrapy_crawl_async(
 
         stdout_task = asyncio.create_task(read_stream(process.stdout, job_id, "stdout"))
         stderr_task = asyncio.create_task(read_stream(process.stderr, job_id, "stderr"))
+        for task in (stdout_task, stderr_task):
+            _reader_tasks.add(task)
+            task.add_done_callback(_reader_tasks.discard)
 
-        return process
+        return process, stdout_task, stderr_task
 
     except FileNotFoundError:
         logger.error(
@@ -114,18 +138,26 @@ async def launch_scrapy_crawl_async(
 
 
 async def read_stream(stream, job_id, stream_name):
+    """
+    Logs the output of the Scrapy process line by line. It is read in chunks of
+    READ_CHUNK_SIZE and the complete lines of each chunk are decoded at once; the
+    line split across chunks is carried over as bytes, so no character is cut.
+    """
+    pending = b""
     while True:
-        line = await stream.readline()
-        if line:
-            try:
-                line_str = line.decode("utf-8").rstrip()
-                logger.info(f"Job ID [{job_id}] ({stream_name}): {line_str}")
-            except UnicodeDecodeError:
-                logger.warning(
-                    f"Job ID [{job_id}] ({stream_name}): Could not decode line (non-utf8): {line!r}"
-                )
-        else:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
             break
+        lines, newline, pending = (pending + chunk).rpartition(b"\n")
+        if newline and logger.isEnabledFor(logging.INFO):
+            _log_output(lines, job_id, stream_name)
+    if pending and logger.isEnabledFor(logging.INFO):
+        _log_output(pending, job_id, stream_name)
+
+
+def _log_output(lines, job_id, stream_name):
+    for line_str in lines.decode("utf-8", errors="replace").split("\n"):
+        logger.info(f"Job ID [{job_id}] ({stream_name}): {line_str.rstrip()}")
 
 
 async def main_test():
@@ -136,7 +168,7 @@ async def main_test():
     stdout_task = None
     stderr_task = None
     try:
-        process = await launch_scrapy_crawl_async(
+        process, stdout_task, stderr_task = await launch_scrapy_crawl_async(
             job_id=test_job_id,
             start_url=test_url,
             allowed_domains="quotes.toscrape.com",
@@ -170,16 +202,19 @@ async def main_test():
                 logger.info(f"Subprocess {process.pid} already exited.")
             except Exception as term_err:
                 logger.error(f"Error during process termination: {term_err}")
-                if stdout_task:
-                    try:
-                        await asyncio.wait_for(stdout_task, timeout=2)
-                    except asyncio.TimeoutError:
-                        logger.warning("stdout reader task timed out.")
-                if stderr_task:
-                    try:
-                        await asyncio.wait_for(stderr_task, timeout=2)
-                    except asyncio.TimeoutError:
-                        logger.warning("stderr reader task timed out.")
+
+        # The readers end at EOF once the process has exited; waiting for them
+        # logs the last of its output.
+        if stdout_task:
+            try:
+                await asyncio.wait_for(stdout_task, timeout=2)
+            except asyncio.TimeoutError:
+                logger.warning("stdout reader task timed out.")
+        if stderr_task:
+            try:
+                await asyncio.wait_for(stderr_task, timeout=2)
+            except asyncio.TimeoutError:
+                logger.warning("stderr reader task timed out.")
 
         print("Test finished.")
     except Exception as e:
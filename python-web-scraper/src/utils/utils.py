@@ -1,74 +1,97 @@
 import logging
-from urllib.parse import urlparse, urlunparse
-from typing import Optional, List
+from urllib.parse import ParseResult, urlparse, urlunparse
+from typing import Collection, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+_VALID_SCHEMES = frozenset(("http", "https"))
 
-def validate_url(url_string: str) -> bool:
+
+def parse_http_url(url_string: str) -> Optional[ParseResult]:
     """
-    Checks if a string is a valid HTTP/HTTPS URL with a domain.
+    Parses a string that is a valid HTTP/HTTPS URL with a domain, so callers
+    needing several of its parts parse it only once. Returns None otherwise.
     """
     if not isinstance(url_string, str) or not url_string:
-        return False
+        return None
     try:
         parsed = urlparse(url_string)
-
-        return bool(parsed.scheme in ["http", "https"] and parsed.netloc)
     except ValueError:
+        logger.warning(f"ValueError during URL parsing for: {url_string[:100]}...")
+        return None
+    if parsed.scheme not in _VALID_SCHEMES or not parsed.netloc:
+        return None
+    return parsed
+
+
+def _as_http_url(url: Union[str, ParseResult]) -> Optional[ParseResult]:
+    """parse_http_url for a string; a ParseResult is only checked, not parsed again."""
+    if isinstance(url, ParseResult):
+        if url.scheme not in _VALID_SCHEMES or not url.netloc:
+            return None
+        return url
+    return parse_http_url(url)
+
 
-        logger.warning(f"ValueError during URL validation for: {url_string[:100]}...")
-        return False
+def validate_url(url_string: Union[str, ParseResult]) -> bool:
+    """
+    Checks if a string (or parse_http_url result) is a valid HTTP/HTTPS URL with
+    a domain.
+    """
+    return _as_http_url(url_string) is not None
 
 
-def normalize_url(url_string: str) -> Optional[str]:
+def normalize_url(url_string: Union[str, ParseResult]) -> Optional[str]:
     """
-    Attempts to normalize a URL string.
+    Attempts to normalize a URL string, or an already parsed URL.
     - Ensures http/https scheme (defaults to http if missing).
     - Lowercases scheme and domain.
     - Removes default ports.
     - Removes fragments.
     """
-    if not isinstance(url_string, str) or not url_string:
-        return None
-
-    if "://" not in url_string:
-        logger.debug(f"Assuming http scheme for URL: {url_string}")
-        url_string = "http://" + url_string
-
-    try:
-        parts = urlparse(url_string)
-
-        if not parts.scheme in ["http", "https"] or not parts.netloc:
-            logger.warning(f"Cannot normalize invalid URL structure: {url_string}")
+    if isinstance(url_string, ParseResult):
+        parts = url_string
+    else:
+        if not isinstance(url_string, str) or not url_string:
             return None
 
-        scheme = parts.scheme.lower()
-        netloc = parts.netloc.lower()
-
-        if (scheme == "http" and netloc.endswith(":80")) or (
-            scheme == "https" and netloc.endswith(":443")
-        ):
-            netloc = netloc.rsplit(":", 1)[0]
-
-        normalized = urlunparse(
-            (
-                scheme,
-                netloc,
-                parts.path if parts.path else "/",
-                parts.params,
-                parts.query,
-                "",
+        if "://" not in url_string:
+            logger.debug(f"Assuming http scheme for URL: {url_string}")
+            url_string = "http://" + url_string
+
+        # Only urlparse raises, and only for a malformed IPv6 host.
+        try:
+            parts = urlparse(url_string)
+        except ValueError:
+            logger.warning(
+                f"ValueError during URL normalization for: {url_string[:100]}..."
             )
-        )
+            return None
 
-        return normalized
+    if parts.scheme not in _VALID_SCHEMES or not parts.netloc:
+        logger.warning(f"Cannot normalize invalid URL structure: {url_string}")
+        return None
 
-    except ValueError:
-        logger.warning(
-            f"ValueError during URL normalization for: {url_string[:100]}..."
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+
+    if (scheme == "http" and netloc.endswith(":80")) or (
+        scheme == "https" and netloc.endswith(":443")
+    ):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    normalized = urlunparse(
+        (
+            scheme,
+            netloc,
+            parts.path if parts.path else "/",
+            parts.params,
+            parts.query,
+            "",
         )
-        return None
+    )
+
+    return normalized
 
 
 def validate_depth(depth: int) -> bool:
@@ -76,24 +99,15 @@ def validate_depth(depth: int) -> bool:
     return isinstance(depth, int) and depth >= 0
 
 
-def validate_crawl_strategy(strategy: str, allowed_strategies: List[str]) -> bool:
+def validate_crawl_strategy(strategy: str, allowed_strategies: Collection[str]) -> bool:
     """Checks if the strategy is in the allowed list."""
     return isinstance(strategy, str) and strategy in allowed_strategies
 
 
-def extract_domain(url_string: str) -> Optional[str]:
-    """Extracts the network location (domain) from a URL string."""
-    if not isinstance(url_string, str) or not url_string:
-        return None
-    try:
-        parsed = urlparse(url_string)
-
-        return parsed.netloc if parsed.scheme in ["http", "https"] else None
-    except ValueError:
-        logger.warning(
-            f"ValueError during domain extraction for: {url_string[:100]}..."
-        )
-        return None
+def extract_domain(url_string: Union[str, ParseResult]) -> Optional[str]:
+    """Extracts the network location (domain) from a URL string or parsed URL."""
+    parsed = _as_http_url(url_string)
+    return parsed.netloc if parsed is not None else None
 
 
 if __name__ == "__main__":
@@ -121,6 +135,14 @@ if __name__ == "__main__":
     for url in test_urls:
         print(f"'{url}' -> Domain: {extract_domain(str(url))}")
 
+    print("\n--- Parsed Once ---")
+    for url in test_urls:
+        parsed = parse_http_url(str(url))
+        if parsed is not None:
+            print(
+                f"'{url}' -> Normalized: {normalize_url(parsed)}, Domain: {extract_domain(parsed)}"
+            )
+
     print("\n--- Parameter Validation ---")
     print(f"Depth 2: {validate_depth(2)}")
     print(f"Depth -1: {validate_depth(-1)}")
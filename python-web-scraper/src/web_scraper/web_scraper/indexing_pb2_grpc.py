@@ -39,6 +39,11 @@ class IndexingServiceStub(object):
                 request_serializer=indexing__pb2.ProcessScrapedItemsRequest.SerializeToString,
                 response_deserializer=indexing__pb2.ProcessScrapedItemsResponse.FromString,
                 _registered_method=True)
+        self.ProcessScrapedItemsStream = channel.stream_unary(
+                '/indexing.IndexingService/ProcessScrapedItemsStream',
+                request_serializer=indexing__pb2.ProcessScrapedItemsRequest.SerializeToString,
+                response_deserializer=indexing__pb2.ProcessScrapedItemsResponse.FromString,
+                _registered_method=True)
 
 
 class IndexingServiceServicer(object):
@@ -50,6 +55,15 @@ class IndexingServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ProcessScrapedItemsStream(self, request_iterator, context):
+        """Same as ProcessScrapedItems for a whole crawl: the client streams its items
+        as they are scraped (any number per message, job_id set on the first one)
+        and gets the totals once it closes the stream.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_IndexingServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +72,11 @@ def add_IndexingServiceServicer_to_server(servicer, server):
                     request_deserializer=indexing__pb2.ProcessScrapedItemsRequest.FromString,
                     response_serializer=indexing__pb2.ProcessScrapedItemsResponse.SerializeToString,
             ),
+            'ProcessScrapedItemsStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.ProcessScrapedItemsStream,
+                    request_deserializer=indexing__pb2.ProcessScrapedItemsRequest.FromString,
+                    response_serializer=indexing__pb2.ProcessScrapedItemsResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'indexing.IndexingService', rpc_method_handlers)
@@ -95,3 +114,30 @@ class IndexingService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def ProcessScrapedItemsStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/indexing.IndexingService/ProcessScrapedItemsStream',
+            indexing__pb2.ProcessScrapedItemsRequest.SerializeToString,
+            indexing__pb2.ProcessScrapedItemsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,6 +1,8 @@
+import asyncio
+import collections
 import grpc
 import logging
-from itemadapter import ItemAdapter
+from scrapy.utils.defer import deferred_from_coro
 
 from .items import MediaItem
 
@@ -20,6 +22,18 @@ except ImportError as e:
     )
 
 
+# Seconds before a failed ProcessScrapedItemsStream call is opened again.
+STREAM_RETRY_DELAY = 1.0
+# The items stream lives as long as the crawl: keepalive pings detect a dead Go
+# API while the spider is idle (the Go server permits them every 10s), and
+# transparent retries are off since _stream_items reopens the stream itself.
+GO_API_CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.enable_retries", 0),
+]
 
 MEDIA_TYPE_MAP_TO_PROTO = {
     "image": indexing_pb2.MediaType.IMAGE,
@@ -29,36 +43,93 @@ MEDIA_TYPE_MAP_TO_PROTO = {
 
 class GoApiPipeline:
 
-    def __init__(self, go_api_grpc_address, batch_size, job_id):
+    def __init__(
+        self,
+        go_api_grpc_address,
+        batch_size,
+        job_id,
+        max_inflight_batches=4,
+        max_batch_size=1000,
+        flush_interval_ms=2000,
+        max_seen_media_urls=200_000,
+    ):
         if not GRPC_AVAILABLE:
             raise NotConfigured("gRPC modules not available or import failed.")
         self.go_api_grpc_address = go_api_grpc_address
+        # Items go to the Go API over one ProcessScrapedItemsStream call for the
+        # whole crawl, batch_size items per message while the stream keeps up. A
+        # message grows by batch_size per message still queued for the stream (up
+        # to max_batch_size), so a busy API gets fewer, larger messages.
         self.batch_size = batch_size
+        self.max_batch_size = max(max_batch_size, batch_size)
+        # Messages queued for the stream; a full buffer beyond that waits for the
+        # stream to take one, which bounds memory.
+        self.max_inflight_batches = max(max_inflight_batches, 1)
+        # A partial buffer is sent after this long once the queue is empty, so
+        # items of a stalling crawl are not held until the spider closes.
+        self.flush_interval = flush_interval_ms / 1000
+        # Media URLs already sent in this run (logos, sprites and the like recur on
+        # many pages), in LRU order; repeats are not sent to the Go API again.
+        self.max_seen_media_urls = max_seen_media_urls
+        self._seen_media_urls = collections.OrderedDict()
 
         self.job_id = job_id or "unknown-job"
-        self.item_buffer = []
+        # The request of the next batch; items are built in place in its repeated
+        # field instead of being copied into a new request when it is sent.
+        self._batch = self._new_batch()
         self.channel = None
         self.stub = None
+        self._send_queue = None
+        self._stream_task = None
+        self._stream_closed = False
+        self._flush_timer = None
 
     @classmethod
     def from_crawler(cls, crawler):
 
         address = crawler.settings.get("GO_API_GRPC_ADDRESS")
         batch_size = crawler.settings.getint("PIPELINE_BATCH_SIZE", 100)
+        max_inflight_batches = crawler.settings.getint(
+            "PIPELINE_MAX_INFLIGHT_BATCHES", 4
+        )
+        max_batch_size = crawler.settings.getint("PIPELINE_MAX_BATCH_SIZE", 1000)
+        flush_interval_ms = crawler.settings.getfloat(
+            "PIPELINE_FLUSH_INTERVAL_MS", 2000
+        )
+        max_seen_media_urls = crawler.settings.getint(
+            "PIPELINE_MAX_SEEN_MEDIA_URLS", 200_000
+        )
 
         job_id = crawler.settings.get("JOB_ID", None)
         if not address:
             raise NotConfigured("GO_API_GRPC_ADDRESS setting is missing.")
-        return cls(go_api_grpc_address=address, batch_size=batch_size, job_id=job_id)
+        return cls(
+            go_api_grpc_address=address,
+            batch_size=batch_size,
+            job_id=job_id,
+            max_inflight_batches=max_inflight_batches,
+            max_batch_size=max_batch_size,
+            flush_interval_ms=flush_interval_ms,
+            max_seen_media_urls=max_seen_media_urls,
+        )
 
     def open_spider(self, spider):
+        self._seen_media_urls.clear()
         if not GRPC_AVAILABLE:
             return
         try:
 
-            self.channel = grpc.insecure_channel(self.go_api_grpc_address)
+            # An asyncio channel on the reactor's loop (AsyncioSelectorReactor), so
+            # batches are sent without blocking the crawl.
+            self.channel = grpc.aio.insecure_channel(
+                self.go_api_grpc_address, options=GO_API_CHANNEL_OPTIONS
+            )
+            # Starts connecting now rather than on the first batch.
+            self.channel.get_state(try_to_connect=True)
 
             self.stub = indexing_pb2_grpc.IndexingServiceStub(self.channel)
+            self._send_queue = asyncio.Queue(maxsize=self.max_inflight_batches)
+            self._stream_task = asyncio.ensure_future(self._stream_items())
             logger.info(
                 f"[Job {self.job_id}] Connected to Go API gRPC at {self.go_api_grpc_address}"
             )
@@ -69,31 +140,45 @@ class GoApiPipeline:
             )
             self.channel = None
             self.stub = None
+            self._send_queue = None
+            self._stream_task = None
 
     def close_spider(self, spider):
-        if self.stub and self.item_buffer:
+        return deferred_from_coro(self._close())
+
+    async def _close(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self.stub and self._batch.items:
             logger.info(
-                f"[Job {self.job_id}] Spider closing, sending final batch of {len(self.item_buffer)} items to Go API."
+                f"[Job {self.job_id}] Spider closing, sending final batch of {len(self._batch.items)} items to Go API."
             )
-            self._send_batch()
+            await self._send_batch()
+        if self._stream_task is not None:
+            # Ends the request stream once the queued messages are sent.
+            await self._send_queue.put(None)
+            await self._stream_task
+            self._stream_task = None
         if self.channel:
-            self.channel.close()
+            await self.channel.close()
             logger.info(f"[Job {self.job_id}] Closed connection to Go API gRPC.")
 
-    def process_item(self, item, spider):
+    async def process_item(self, item, spider):
         if not GRPC_AVAILABLE or not self.stub:
             logger.warning(
                 f"[Job {self.job_id}] Dropping item due to unavailable gRPC connection/modules: {item.get('media_url')}"
             )
             return item
 
-        if not isinstance(item, MediaItem):
+        if item.__class__ is not MediaItem and not isinstance(item, MediaItem):
             return item
 
-        adapter = ItemAdapter(item)
-        page_url = adapter.get("page_url")
-        media_url = adapter.get("media_url")
-        media_type_str = adapter.get("media_type")
+        # A MediaItem is a dict-like scrapy.Item with known fields, so it is read
+        # directly rather than through an ItemAdapter.
+        page_url = item.get("page_url")
+        media_url = item.get("media_url")
+        media_type_str = item.get("media_type")
 
         if not all([page_url, media_url, media_type_str]):
             logger.warning(
@@ -111,54 +196,124 @@ class GoApiPipeline:
             )
             return item
 
-        scraped_item_proto = indexing_pb2.ScrapedItem(
+        seen = self._seen_media_urls
+        if media_url in seen:
+            seen.move_to_end(media_url)
+            logger.debug(
+                f"[Job {self.job_id}] Skipping already sent media: page={page_url}, media={media_url}"
+            )
+            return item
+        seen[media_url] = None
+        if len(seen) > self.max_seen_media_urls:
+            seen.popitem(last=False)
+
+        self._batch.items.add(
             page_url=page_url, media_url=media_url, media_type=proto_media_type
         )
-        self.item_buffer.append(scraped_item_proto)
         logger.debug(
             f"[Job {self.job_id}] Buffered item: page={page_url}, media={media_url}"
         )
 
-        if len(self.item_buffer) >= self.batch_size:
+        if len(self._batch.items) >= self._flush_threshold():
             logger.info(
-                f"[Job {self.job_id}] Buffer full ({len(self.item_buffer)} items), sending batch to Go API."
+                f"[Job {self.job_id}] Buffer full ({len(self._batch.items)} items), sending batch to Go API."
             )
-            self._send_batch()
+            await self._send_batch()
+        else:
+            self._arm_flush_timer()
 
         return item
 
-    def _send_batch(self):
-        if not self.item_buffer or not self.stub:
-            return
-
-        request = indexing_pb2.ProcessScrapedItemsRequest(
-            items=self.item_buffer, job_id=self.job_id
+    def _flush_threshold(self):
+        return min(
+            self.max_batch_size, self.batch_size * (1 + self._send_queue.qsize())
         )
 
-        try:
-
-            response = self.stub.ProcessScrapedItems(request, timeout=90)
-            logger.info(
-                f"[Job {self.job_id}] Sent batch of {len(self.item_buffer)} items to Go API. Response: {response.message}"
+    def _arm_flush_timer(self):
+        if self._flush_timer is None and self.flush_interval > 0:
+            self._flush_timer = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._on_flush_timer
             )
 
-            if response.items_failed > 0:
-                logger.warning(
-                    f"[Job {self.job_id}] Go API reported {response.items_failed} failures during batch processing."
+    def _on_flush_timer(self):
+        self._flush_timer = None
+        if not self._batch.items:
+            return
+        if not self._send_queue.empty():
+            # Sent with the next full batch, or once the stream has caught up.
+            self._arm_flush_timer()
+            return
+        logger.info(
+            f"[Job {self.job_id}] Flushing partial batch of {len(self._batch.items)} items to Go API."
+        )
+        self._send_queue.put_nowait(self._take_batch())
+
+    async def _send_batch(self):
+        """
+        Queues the buffered items as one message of the stream, waiting only while
+        max_inflight_batches messages are queued already.
+        """
+        request = self._take_batch()
+        if request is None:
+            return
+        await self._send_queue.put(request)
+
+    def _take_batch(self):
+        """Moves the buffered items into a request, or returns None if there are none."""
+        if not self._batch.items or not self.stub:
+            return None
+
+        # Handed over as is: it waits in the send queue while items arriving
+        # meanwhile start the next batch.
+        request = self._batch
+        self._batch = self._new_batch()
+        return request
+
+    def _new_batch(self):
+        return indexing_pb2.ProcessScrapedItemsRequest(job_id=self.job_id)
+
+    async def _queued_requests(self):
+        while True:
+            request = await self._send_queue.get()
+            if request is None:
+                self._stream_closed = True
+                return
+            yield request
+
+    async def _stream_items(self):
+        """
+        Runs the ProcessScrapedItemsStream call until _close ends the queue. A call
+        that fails loses the messages it had taken; a new one is opened for the rest.
+        """
+        self._stream_closed = False
+        while True:
+            try:
+
+                response = await self.stub.ProcessScrapedItemsStream(
+                    self._queued_requests()
+                )
+                logger.info(
+                    f"[Job {self.job_id}] Sent {response.items_received} items to Go API. Response: {response.message}"
                 )
 
-        except grpc.RpcError as e:
-            logger.error(
-                f"[Job {self.job_id}] gRPC error sending batch to Go API: {e.status()} - {e.details()}",
-                exc_info=True,
-            )
-        except Exception as e:
-            logger.error(
-                f"[Job {self.job_id}] Unexpected error sending batch to Go API: {e}",
-                exc_info=True,
-            )
-        finally:
-            self.item_buffer.clear()
+                if response.items_failed > 0:
+                    logger.warning(
+                        f"[Job {self.job_id}] Go API reported {response.items_failed} failures during stream processing."
+                    )
+
+            except grpc.RpcError as e:
+                logger.error(
+                    f"[Job {self.job_id}] gRPC error streaming items to Go API: {e.code()} - {e.details()}",
+                    exc_info=True,
+                )
+            except Exception as e:
+                logger.error(
+                    f"[Job {self.job_id}] Unexpected error streaming items to Go API: {e}",
+                    exc_info=True,
+                )
+            if self._stream_closed:
+                return
+            await asyncio.sleep(STREAM_RETRY_DELAY)
 
 
 class NotConfigured(Exception):
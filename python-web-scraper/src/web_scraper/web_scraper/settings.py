@@ -87,6 +87,14 @@ DEPTH_LIMIT = 2
 FEATURE_EXTRACTOR_ADDRESS = 'python-feature-extraction:50051' 
 
 PIPELINE_BATCH_SIZE = 100
+# Batches GoApiPipeline queues for its stream to the Go API before waiting.
+PIPELINE_MAX_INFLIGHT_BATCHES = 4
+# Batches grow by PIPELINE_BATCH_SIZE per batch queued, up to this size.
+PIPELINE_MAX_BATCH_SIZE = 1000
+# Partial batches are sent after this long once no batch is queued.
+PIPELINE_FLUSH_INTERVAL_MS = 2000
+# Media URLs remembered per run so repeats (logos, sprites) are sent only once.
+PIPELINE_MAX_SEEN_MEDIA_URLS = 200_000
 
 LOG_LEVEL = 'INFO'
 
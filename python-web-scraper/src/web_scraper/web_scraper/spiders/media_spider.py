@@ -1,6 +1,7 @@
 import scrapy
-from scrapy.linkextractors import LinkExtractor
+from parsel.csstranslator import HTMLTranslator
 from urllib.parse import urlparse
+from typing import Dict, Optional
 import logging
 
 
@@ -8,6 +9,11 @@ from ..items import MediaItem
 
 logger = logging.getLogger(__name__)
 
+# Media elements whose src must be of one type; a and source links may be either.
+_TAG_MEDIA_KINDS = {"img": "image", "audio": "audio"}
+_UNCLASSIFIED = object()
+_HTTP_PREFIXES = ("http://", "https://")
+
 
 class MediaSpider(scrapy.Spider):
     name = "media"
@@ -23,6 +29,12 @@ class MediaSpider(scrapy.Spider):
         ".tiff",
     ]
     AUDIO_EXTENSIONS = [".mp3", ".wav", ".ogg", ".m4a", ".flac", ".aac"]
+    # Tuples for str.endswith, which checks all suffixes in one call.
+    IMAGE_SUFFIXES = tuple(IMAGE_EXTENSIONS)
+    AUDIO_SUFFIXES = tuple(AUDIO_EXTENSIONS)
+    MEDIA_SUFFIXES = IMAGE_SUFFIXES + AUDIO_SUFFIXES
+
+    MEDIA_AND_LINK_XPATH = "//img[@src] | //audio[@src] | //source[@src] | //a[@href]"
 
     PAGINATION_SELECTORS = [
         'a[rel="next"]::attr(href)',
@@ -32,6 +44,10 @@ class MediaSpider(scrapy.Spider):
         ".pagination a::attr(href)",
         ".pager a::attr(href)",
     ]
+    # Translated once here instead of by response.css on every page.
+    PAGINATION_XPATHS = tuple(
+        HTMLTranslator().css_to_xpath(selector) for selector in PAGINATION_SELECTORS
+    )
 
     def __init__(
         self,
@@ -74,6 +90,9 @@ class MediaSpider(scrapy.Spider):
                 logger.warning(
                     f"Could not derive allowed_domain from start_url: {start_url}. Crawling might be restricted."
                 )
+        # For the offsite check of _classify_url, which runs before a link becomes a
+        # request rather than in OffsiteMiddleware after it.
+        self._allowed_domains_set = frozenset(d.lower() for d in self.allowed_domains)
 
         self.custom_settings = {
             "DEPTH_LIMIT": int(depth_limit),
@@ -104,39 +123,46 @@ class MediaSpider(scrapy.Spider):
         if self.use_playwright and "playwright" in response.flags:
             logger.debug(f"Page rendered with Playwright: {page_url}")
 
-        extracted_media = set()
-
-        for src in response.css("img::attr(src)").getall():
-            abs_url = response.urljoin(src.strip())
-            if self._is_valid_media_url(abs_url, "image"):
-                extracted_media.add((abs_url, "image"))
-
-        for src in response.css("audio::attr(src)").getall():
-            abs_url = response.urljoin(src.strip())
-            if self._is_valid_media_url(abs_url, "audio"):
-                extracted_media.add((abs_url, "audio"))
-
-        for href in response.css("a::attr(href)").getall():
-            abs_url = response.urljoin(href.strip())
-            if self._is_valid_media_url(abs_url, "image"):
-                extracted_media.add((abs_url, "image"))
-            elif self._is_valid_media_url(abs_url, "audio"):
-                extracted_media.add((abs_url, "audio"))
-
-        for src in response.css("source::attr(src)").getall():
-            abs_url = response.urljoin(src.strip())
-
-            if self._is_valid_media_url(abs_url, "image"):
-                extracted_media.add((abs_url, "image"))
-            elif self._is_valid_media_url(abs_url, "audio"):
-                extracted_media.add((abs_url, "audio"))
+        # One set of URLs per media type (the extensions never match both types).
+        image_urls = set()
+        audio_urls = set()
+        urls_by_kind = {"image": image_urls, "audio": audio_urls}
+        # Each absolute URL on the page is parsed and classified once, however many
+        # of the checks below see it (see _classify_url).
+        url_kinds: Dict[str, Optional[str]] = {}
+
+        def url_kind(url: str) -> Optional[str]:
+            kind = url_kinds.get(url, _UNCLASSIFIED)
+            if kind is _UNCLASSIFIED:
+                kind = url_kinds[url] = self._classify_url(url)
+            return kind
+
+        # One walk over the document for all media and link elements, in document
+        # order; img and audio only count for their own media type.
+        anchor_urls = []
+        for element in response.xpath(self.MEDIA_AND_LINK_XPATH):
+            node = element.root
+            tag = node.tag
+            attribute = "href" if tag == "a" else "src"
+            abs_url = response.urljoin(node.get(attribute).strip())
+            if tag == "a":
+                # Reused by the default crawl strategy, which follows the same links.
+                anchor_urls.append(abs_url)
+            kind = url_kind(abs_url)
+            expected_kind = _TAG_MEDIA_KINDS.get(tag)
+            if expected_kind is not None and kind != expected_kind:
+                continue
+            kind_urls = urls_by_kind.get(kind)
+            if kind_urls is not None:
+                kind_urls.add(abs_url)
 
         found_count = 0
-        for media_url, media_type in extracted_media:
-            yield MediaItem(
-                page_url=page_url, media_url=media_url, media_type=media_type
-            )
-            found_count += 1
+        for media_type, kind_urls in urls_by_kind.items():
+            for media_url in kind_urls:
+                yield MediaItem(
+                    page_url=page_url, media_url=media_url, media_type=media_type
+                )
+            found_count += len(kind_urls)
         if found_count > 0:
             logger.info(f"Found {found_count} potential media items on {page_url}")
 
@@ -150,21 +176,31 @@ class MediaSpider(scrapy.Spider):
             logger.debug(
                 f"Crawl strategy is 'pagination_only', looking for pagination links on {page_url}"
             )
-            link_selectors = self.PAGINATION_SELECTORS
+            link_xpaths = self.PAGINATION_XPATHS
         else:
             logger.debug(
                 f"Crawl strategy is 'default', looking for all valid links on {page_url}"
             )
-            link_selectors = ["a::attr(href)"]
+            # Followed from the anchors collected above.
+            link_xpaths = (None,)
 
         followed_count = 0
         processed_links_on_page = set()
 
-        for selector in link_selectors:
-            for href in response.css(selector).getall():
-                next_page_url = response.urljoin(href.strip())
-
-                if self._is_valid_crawl_url(next_page_url, processed_links_on_page):
+        for xpath in link_xpaths:
+            if xpath is None:
+                next_page_urls = anchor_urls
+            else:
+                next_page_urls = [
+                    response.urljoin(href.strip())
+                    for href in response.xpath(xpath).getall()
+                ]
+            for next_page_url in next_page_urls:
+                if (
+                    next_page_url
+                    and next_page_url not in processed_links_on_page
+                    and url_kind(next_page_url) == "page"
+                ):
                     processed_links_on_page.add(next_page_url)
                     yield scrapy.Request(
                         next_page_url,
@@ -176,37 +212,46 @@ class MediaSpider(scrapy.Spider):
         if followed_count > 0:
             logger.info(f"Following {followed_count} links from {page_url}")
 
-    def _is_valid_media_url(self, url: str, expected_type: str) -> bool:
-        """Checks if a URL seems like a valid media URL of the expected type."""
+    def _classify_url(self, url: str) -> Optional[str]:
+        """
+        Parses a URL once and classifies it: "image" or "audio" for a media URL of
+        that type (on any domain), "page" for any other http(s) URL on an allowed
+        domain, "offsite" for one on another domain, else None.
+        """
         if not url:
-            return False
+            return None
+        # javascript:, mailto:, tel: and data: links are rejected without a parse;
+        # the lowercased retry only runs for the rare upper-case scheme.
+        if not url.startswith(_HTTP_PREFIXES) and not url[:8].lower().startswith(
+            _HTTP_PREFIXES
+        ):
+            return None
         parsed = urlparse(url)
         if not parsed.scheme in ["http", "https"]:
-            return False
+            return None
         if not parsed.netloc:
-            return False
+            return None
 
         path = parsed.path.lower()
-        if expected_type == "image":
-            return any(path.endswith(ext) for ext in self.IMAGE_EXTENSIONS)
-        elif expected_type == "audio":
-            return any(path.endswith(ext) for ext in self.AUDIO_EXTENSIONS)
+        if path.endswith(self.IMAGE_SUFFIXES):
+            return "image"
+        if path.endswith(self.AUDIO_SUFFIXES):
+            return "audio"
+        if not self._is_allowed_host(parsed):
+            return "offsite"
+        return "page"
+
+    def _is_allowed_host(self, parsed) -> bool:
+        """
+        Whether a parsed URL is on one of allowed_domains or a subdomain of one, as
+        OffsiteMiddleware decides it. Any host is allowed if there are none.
+        """
+        allowed = self._allowed_domains_set
+        if not allowed or parsed.netloc.lower() in allowed:
+            return True
+        host = parsed.hostname or ""
+        while host:
+            if host in allowed:
+                return True
+            _, _, host = host.partition(".")
         return False
-
-    def _is_valid_crawl_url(self, url: str, already_processed: set) -> bool:
-        """Checks if a URL is valid for crawling further."""
-        if not url or url in already_processed:
-            return False
-        parsed = urlparse(url)
-        if not parsed.scheme in ["http", "https"]:
-            return False
-        if not parsed.netloc:
-            return False
-
-        path = parsed.path.lower()
-        if any(
-            path.endswith(ext) for ext in self.IMAGE_EXTENSIONS + self.AUDIO_EXTENSIONS
-        ):
-            return False
-
-        return True